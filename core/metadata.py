@@ -9,51 +9,283 @@
 Использует кэширование для оптимизации производительности при повторных запросах.
 """
 
+import importlib
 import logging
 import os
-from datetime import datetime
-from functools import lru_cache
-from typing import Dict, Optional, Tuple
+import struct
+import time
+from collections import OrderedDict
+from functools import lru_cache, partial
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
+# Попытка импортировать Pillow для работы с изображениями
+HAS_PIL = False
+try:
+    from PIL import Image
+    from PIL.ExifTags import TAGS
+    HAS_PIL = True
+except ImportError:
+    HAS_PIL = False
+
+# Попытка импортировать mutagen для работы с аудио
+HAS_MUTAGEN = False
+try:
+    from mutagen import File as MutagenFile
+    from mutagen.id3 import ID3NoHeaderError
+    HAS_MUTAGEN = True
+except ImportError:
+    HAS_MUTAGEN = False
+
+# Идентификаторы EXIF тегов по имени в нижнем регистре (у нескольких
+# идентификаторов может быть одно имя)
+_EXIF_TAG_IDS: Dict[str, Tuple[int, ...]] = {}
+
+
+def _fill_exif_tag_ids() -> None:
+    """Заполнение _EXIF_TAG_IDS из таблицы тегов Pillow."""
+    for tag_id, tag_name in TAGS.items():
+        key = tag_name.lower()
+        _EXIF_TAG_IDS[key] = _EXIF_TAG_IDS.get(key, ()) + (tag_id,)
+
+
+if HAS_PIL:
+    _fill_exif_tag_ids()
+
+# Библиотеки могут быть установлены во время работы программы (LibraryManager),
+# поэтому неудавшийся импорт повторяется, но не чаще этого интервала (секунды)
+_IMPORT_RETRY_INTERVAL = 5.0
+# Время последней попытки импорта по имени библиотеки (time.monotonic)
+_last_import_attempt: Dict[str, float] = {}
+
+
+def _import_retry_due(name: str) -> bool:
+    """Проверка, пора ли повторить импорт библиотеки.
+    
+    Args:
+        name: Имя библиотеки
+        
+    Returns:
+        True если с прошлой попытки прошло не меньше _IMPORT_RETRY_INTERVAL
+    """
+    now = time.monotonic()
+    if now - _last_import_attempt.get(name, float('-inf')) < _IMPORT_RETRY_INTERVAL:
+        return False
+    _last_import_attempt[name] = now
+    # Новые пакеты в site-packages не видны без сброса кэшей импорта
+    importlib.invalidate_caches()
+    return True
+
+
+def _ensure_pil() -> bool:
+    """Проверка доступности Pillow с повторной попыткой импорта.
+    
+    Returns:
+        True если Pillow доступен
+    """
+    global HAS_PIL, Image, TAGS
+    if HAS_PIL or not _import_retry_due('PIL'):
+        return HAS_PIL
+    try:
+        from PIL import Image
+        from PIL.ExifTags import TAGS
+    except ImportError:
+        return False
+    _fill_exif_tag_ids()
+    HAS_PIL = True
+    return True
+
+
+def _ensure_mutagen() -> bool:
+    """Проверка доступности mutagen с повторной попыткой импорта.
+    
+    Returns:
+        True если mutagen доступен
+    """
+    global HAS_MUTAGEN, MutagenFile, ID3NoHeaderError
+    if HAS_MUTAGEN or not _import_retry_due('mutagen'):
+        return HAS_MUTAGEN
+    try:
+        from mutagen import File as MutagenFile
+        from mutagen.id3 import ID3NoHeaderError
+    except ImportError:
+        return False
+    HAS_MUTAGEN = True
+    return True
+
+# Максимальное число файлов в кэшах метаданных (старые записи вытесняются)
+_MAX_METADATA_CACHE_SIZE = 1024
+
+# Функция извлечения значения одного тега: (путь, результат os.stat) -> значение
+TagHandler = Callable[[str, os.stat_result], Optional[str]]
+
+# Формат дат в именах файлов (для time.strftime)
+_DATE_FMT = "%Y-%m-%d"
+
+# Единицы размера файла и их множители (каждая следующая в 2**10 раз больше)
+_SIZE_UNITS = ('B', 'KB', 'MB', 'GB')
+_SIZE_SCALES = (1, 1 << 10, 1 << 20, 1 << 30)
+
+# Аудио теги шаблона и соответствующие им имена тегов mutagen
+_AUDIO_TAGS = {
+    "{artist}": 'artist',
+    "{title}": 'title',
+    "{album}": 'album',
+    "{year}": 'date',
+    "{track}": 'tracknumber',
+    "{genre}": 'genre',
+}
+
+# Ключ кэша: путь, время изменения и размер файла - после изменения
+# или замены файла запись перестает совпадать и данные читаются заново
+_FileKey = Tuple[str, int, int]
+
+
+def _file_key(file_path: str, st: os.stat_result) -> _FileKey:
+    """Получение ключа кэша для файла.
+    
+    Args:
+        file_path: Путь к файлу
+        st: Результат os.stat для файла
+        
+    Returns:
+        Кортеж (путь, mtime в наносекундах, размер)
+    """
+    return (file_path, st.st_mtime_ns, st.st_size)
+
+
+# Сколько байт начала файла читать для поиска размеров в заголовке
+_HEADER_READ_SIZE = 64 * 1024
+
+# Маркеры JPEG, после которых идут размеры кадра (SOF0-SOF15, кроме DHT, JPG и DAC)
+_JPEG_SOF_MARKERS = frozenset(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+
+
+def _jpeg_dimensions(header: bytes) -> Optional[Tuple[int, int]]:
+    """Поиск размеров кадра в заголовке JPEG.
+    
+    Args:
+        header: Начало файла (после сигнатуры FF D8)
+        
+    Returns:
+        Кортеж (ширина, высота) или None, если маркер SOF не найден
+    """
+    pos = 2
+    end = len(header)
+    while pos + 4 <= end:
+        if header[pos] != 0xFF:
+            return None
+        marker = header[pos + 1]
+        if marker == 0xFF:
+            # Байт-заполнитель перед маркером
+            pos += 1
+            continue
+        if marker == 0x01 or 0xD0 <= marker <= 0xD7:
+            # Маркеры без данных
+            pos += 2
+            continue
+        if marker in _JPEG_SOF_MARKERS:
+            if pos + 9 > end:
+                return None
+            height, width = struct.unpack_from('>HH', header, pos + 5)
+            return width, height
+        # Пропускаем сегмент: длина включает два байта самого поля длины
+        pos += 2 + struct.unpack_from('>H', header, pos + 2)[0]
+    return None
+
+
+def _fast_dimensions(file_path: str) -> Optional[Tuple[int, int]]:
+    """Чтение размеров изображения из заголовка файла без Pillow.
+    
+    Размеры PNG, GIF, WebP и JPEG хранятся в начале файла, поэтому
+    достаточно прочитать его первые _HEADER_READ_SIZE байт.
+    
+    Args:
+        file_path: Путь к файлу
+        
+    Returns:
+        Кортеж (ширина, высота) или None для других форматов
+        и нераспознанных заголовков
+    """
+    try:
+        with open(file_path, 'rb') as f:
+            header = f.read(_HEADER_READ_SIZE)
+    except OSError:
+        return None
+    
+    try:
+        if header.startswith(b'\x89PNG\r\n\x1a\n') and header[12:16] == b'IHDR':
+            return struct.unpack_from('>II', header, 16)
+        if header[:6] in (b'GIF87a', b'GIF89a'):
+            return struct.unpack_from('<HH', header, 6)
+        if header[:4] == b'RIFF' and header[8:12] == b'WEBP':
+            chunk = header[12:16]
+            if chunk == b'VP8X':
+                # Размер холста: 24-битные числа (значение минус 1)
+                width = int.from_bytes(header[24:27], 'little') + 1
+                height = int.from_bytes(header[27:30], 'little') + 1
+                return width, height
+            if chunk == b'VP8 ' and header[23:26] == b'\x9d\x01\x2a':
+                width, height = struct.unpack_from('<HH', header, 26)
+                return width & 0x3FFF, height & 0x3FFF
+            if chunk == b'VP8L' and header[20] == 0x2F:
+                bits = int.from_bytes(header[21:25], 'little')
+                return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+            return None
+        if header[:2] == b'\xff\xd8':
+            return _jpeg_dimensions(header)
+    except (struct.error, IndexError):
+        pass
+    return None
+
+
+def _cache_put(cache: "OrderedDict[_FileKey, object]", key: _FileKey, value) -> None:
+    """Добавление записи в кэш с ограничением размера.
+    
+    Args:
+        cache: Кэш метаданных
+        key: Ключ файла
+        value: Сохраняемое значение
+    """
+    if len(cache) >= _MAX_METADATA_CACHE_SIZE:
+        # Удаляем запись, к которой дольше всего не обращались
+        cache.popitem(last=False)
+    cache[key] = value
+
 
 class MetadataExtractor:
     """Класс для извлечения метаданных из файлов."""
     
+    __slots__ = ('_image_cache', '_size_cache', '_audio_cache', '_tag_handlers')
+    
     def __init__(self):
         """Инициализация экстрактора метаданных."""
-        self.pillow_available = False
-        self.mutagen_available = False
-        
         # Кэш для метаданных изображений (чтобы не открывать файл несколько раз)
-        self._image_cache: Dict[str, Tuple[int, int, Optional[object]]] = {}
+        self._image_cache: "OrderedDict[_FileKey, Optional[Tuple[int, int, Dict]]]" = OrderedDict()
+        # Кэш размеров изображений, прочитанных из заголовка (см. _get_image_size)
+        self._size_cache: "OrderedDict[_FileKey, Optional[Tuple[int, int]]]" = OrderedDict()
         # Кэш для аудио метаданных
-        self._audio_cache: Dict[str, Optional[object]] = {}
+        self._audio_cache: "OrderedDict[_FileKey, Optional[object]]" = OrderedDict()
         
-        # Попытка импортировать Pillow для работы с изображениями
-        try:
-            from PIL import Image
-            from PIL.ExifTags import TAGS
-            self.Image = Image
-            self.TAGS = TAGS
-            self.pillow_available = True
-        except ImportError:
-            self.pillow_available = False
-        
-        # Попытка импортировать mutagen для работы с аудио
-        try:
-            from mutagen import File as MutagenFile
-            from mutagen.id3 import ID3NoHeaderError
-            self.MutagenFile = MutagenFile
-            self.ID3NoHeaderError = ID3NoHeaderError
-            self.mutagen_available = True
-        except ImportError:
-            self.mutagen_available = False
+        # Таблица обработчиков известных тегов: тег разбирается один раз,
+        # а не цепочкой сравнений при каждом вызове extract
+        self._tag_handlers: Dict[str, TagHandler] = {
+            "{width}x{height}": self._extract_dimensions,
+            "{width}": self._extract_width,
+            "{height}": self._extract_height,
+            "{date_created}": self._extract_date_created,
+            "{date_modified}": self._extract_date_modified,
+            "{file_size}": self._extract_file_size,
+            "{filename}": lambda file_path, st: os.path.basename(file_path),
+        }
+        for tag, tag_name in _AUDIO_TAGS.items():
+            self._tag_handlers[tag] = partial(self._extract_audio_tag, tag_name=tag_name)
     
     def clear_cache(self):
         """Очистка кэша метаданных."""
         self._image_cache.clear()
+        self._size_cache.clear()
         self._audio_cache.clear()
     
     def extract(self, tag: str, file_path: str) -> Optional[str]:
@@ -67,50 +299,101 @@ class MetadataExtractor:
         Returns:
             Значение метаданных в виде строки или None
         """
-        if not os.path.exists(file_path):
+        handler = self.get_tag_handler(tag)
+        if handler is None:
+            return None
+        # Один вызов stat служит и проверкой существования файла,
+        # и источником дат и размера для всех обработчиков
+        try:
+            st = os.stat(file_path)
+        except OSError:
             return None
+        return handler(file_path, st)
+    
+    @property
+    def pillow_available(self) -> bool:
+        """Доступен ли Pillow (с повторной попыткой импорта, см. _ensure_pil)."""
+        return _ensure_pil()
+    
+    @property
+    def mutagen_available(self) -> bool:
+        """Доступен ли mutagen (с повторной попыткой импорта, см. _ensure_mutagen)."""
+        return _ensure_mutagen()
+    
+    def get_tag_handler(self, tag: str) -> Optional[TagHandler]:
+        """Получение функции извлечения значения тега.
+        
+        Args:
+            tag: Тег метаданных (например, "{width}x{height}", "{date_created}")
+            
+        Returns:
+            Функция, принимающая путь к файлу и результат os.stat, или None
+            для неизвестного тега
+        """
+        # Известные теги (включая "{width}x{height}") - один поиск в словаре
+        handler = self._tag_handlers.get(tag)
+        if handler is not None:
+            return handler
         
-        # Обработка составных тегов (например, "{width}x{height}")
+        # Обработка прочих составных тегов с шириной и высотой
         if "x" in tag and "{width}" in tag and "{height}" in tag:
-            return self._extract_dimensions(file_path)
-        
-        # Обработка отдельных тегов
-        if tag == "{width}":
-            return self._extract_width(file_path)
-        elif tag == "{height}":
-            return self._extract_height(file_path)
-        elif tag == "{date_created}":
-            return self._extract_date_created(file_path)
-        elif tag == "{date_modified}":
-            return self._extract_date_modified(file_path)
-        elif tag == "{file_size}":
-            return self._extract_file_size(file_path)
-        elif tag == "{filename}":
-            return os.path.basename(file_path)
-        # Метаданные аудио
-        elif tag == "{artist}":
-            return self._extract_audio_tag(file_path, 'artist')
-        elif tag == "{title}":
-            return self._extract_audio_tag(file_path, 'title')
-        elif tag == "{album}":
-            return self._extract_audio_tag(file_path, 'album')
-        elif tag == "{year}":
-            return self._extract_audio_tag(file_path, 'date')
-        elif tag == "{track}":
-            return self._extract_audio_tag(file_path, 'tracknumber')
-        elif tag == "{genre}":
-            return self._extract_audio_tag(file_path, 'genre')
+            handler = self._extract_dimensions
         elif tag.startswith("{") and tag.endswith("}"):
             # Попытка извлечь пользовательский тег
-            return self._extract_custom_tag(tag, file_path)
+            handler = partial(self._extract_custom_tag, tag)
+        else:
+            return None
+        # Запоминаем обработчик, чтобы следующие вызовы обошлись поиском в словаре
+        self._tag_handlers[tag] = handler
+        return handler
+    
+    def compile_tags(self, tags: Iterable[str]) -> List[Tuple[str, TagHandler]]:
+        """Подготовка плана извлечения набора тегов.
         
-        return None
+        Разбор тегов выполняется один раз (например, при создании метода
+        переименования), после чего extract_many применяет план к каждому
+        файлу без повторного разбора.
+        
+        Args:
+            tags: Теги метаданных из шаблона
+            
+        Returns:
+            Список пар (тег, функция извлечения); неизвестные теги пропускаются
+        """
+        plan = []
+        for tag in tags:
+            handler = self.get_tag_handler(tag)
+            if handler is not None:
+                plan.append((tag, handler))
+        return plan
     
-    def _get_image_data(self, file_path: str) -> Optional[Tuple[int, int, Optional[object]]]:
+    def extract_many(self, plan: List[Tuple[str, TagHandler]], file_path: str) -> Dict[str, str]:
+        """Извлечение значений всех тегов плана для одного файла.
+        
+        Args:
+            plan: План, подготовленный compile_tags
+            file_path: Путь к файлу
+            
+        Returns:
+            Словарь {тег: значение}; для отсутствующих значений - пустая строка
+        """
+        # Один вызов stat на файл для всех тегов
+        try:
+            st = os.stat(file_path)
+        except OSError:
+            return {tag: "" for tag, _ in plan}
+        return {tag: handler(file_path, st) or "" for tag, handler in plan}
+    
+    def _get_image_data(self, file_path: str, st: os.stat_result) -> Optional[Tuple[int, int, Dict]]:
         """Получение данных изображения с кэшированием.
         
+        Файл открывается один раз: размеры и EXIF сохраняются вместе, и все
+        теги изображения для этого файла берутся из кэша. Неудачная попытка
+        (файл не является изображением) тоже запоминается.
+        
         Args:
             file_path: Путь к файлу изображения
+            st: Результат os.stat для файла
             
         Returns:
             Кортеж (width, height, exifdata) или None
@@ -118,140 +401,171 @@ class MetadataExtractor:
         if not self.pillow_available:
             return None
         
+        key = _file_key(file_path, st)
+        
         # Проверяем кэш
-        if file_path in self._image_cache:
-            return self._image_cache[file_path]
+        if key in self._image_cache:
+            self._image_cache.move_to_end(key)
+            return self._image_cache[key]
         
+        result = None
         try:
-            with self.Image.open(file_path) as img:
+            with Image.open(file_path) as img:
                 width, height = img.size
-                exifdata = img.getexif()
-                result = (width, height, exifdata)
-                # Кэшируем результат
-                self._image_cache[file_path] = result
-                return result
+                # Копия EXIF в обычный словарь не зависит от закрытого файла
+                result = (width, height, dict(img.getexif()))
         except Exception as e:
             logger.debug(f"Не удалось извлечь данные изображения {file_path}: {e}")
-            return None
+        # Кэшируем результат
+        _cache_put(self._image_cache, key, result)
+        return result
     
-    def _extract_dimensions(self, file_path: str) -> Optional[str]:
+    def _get_image_size(self, file_path: str, st: os.stat_result) -> Optional[Tuple[int, int]]:
+        """Получение размеров изображения с кэшированием.
+        
+        Для PNG, GIF, WebP и JPEG размеры читаются из заголовка файла без
+        открытия через Pillow; остальные форматы (и нераспознанные заголовки)
+        открываются через _get_image_data.
+        
+        Args:
+            file_path: Путь к файлу изображения
+            st: Результат os.stat для файла
+            
+        Returns:
+            Кортеж (width, height) или None
+        """
+        key = _file_key(file_path, st)
+        # Файл мог быть уже открыт через Pillow ради EXIF тегов
+        image_data = self._image_cache.get(key)
+        if image_data:
+            return image_data[0], image_data[1]
+        if key in self._size_cache:
+            self._size_cache.move_to_end(key)
+            return self._size_cache[key]
+        
+        size = _fast_dimensions(file_path)
+        if size is None:
+            image_data = self._get_image_data(file_path, st)
+            size = (image_data[0], image_data[1]) if image_data else None
+        _cache_put(self._size_cache, key, size)
+        return size
+    
+    def _extract_dimensions(self, file_path: str, st: os.stat_result) -> Optional[str]:
         """Извлечение размеров изображения (ширина x высота).
         
         Args:
             file_path: Путь к файлу изображения
+            st: Результат os.stat для файла
             
         Returns:
             Строка с размерами в формате "widthxheight" или None
         """
-        image_data = self._get_image_data(file_path)
-        if image_data:
-            width, height, _ = image_data
+        size = self._get_image_size(file_path, st)
+        if size:
+            width, height = size
             return f"{width}x{height}"
         return None
     
-    def _extract_width(self, file_path: str) -> Optional[str]:
+    def _extract_width(self, file_path: str, st: os.stat_result) -> Optional[str]:
         """Извлечение ширины изображения.
         
         Args:
             file_path: Путь к файлу изображения
+            st: Результат os.stat для файла
             
         Returns:
             Ширина изображения в пикселях или None
         """
-        image_data = self._get_image_data(file_path)
-        if image_data:
-            return str(image_data[0])
+        size = self._get_image_size(file_path, st)
+        if size:
+            return str(size[0])
         return None
     
-    def _extract_height(self, file_path: str) -> Optional[str]:
+    def _extract_height(self, file_path: str, st: os.stat_result) -> Optional[str]:
         """Извлечение высоты изображения.
         
         Args:
             file_path: Путь к файлу изображения
+            st: Результат os.stat для файла
             
         Returns:
             Высота изображения в пикселях или None
         """
-        image_data = self._get_image_data(file_path)
-        if image_data:
-            return str(image_data[1])
+        size = self._get_image_size(file_path, st)
+        if size:
+            return str(size[1])
         return None
     
-    def _extract_date_created(self, file_path: str) -> Optional[str]:
+    def _extract_date_created(self, file_path: str, st: os.stat_result) -> Optional[str]:
         """Извлечение даты создания файла.
         
         Args:
             file_path: Путь к файлу
+            st: Результат os.stat для файла
             
         Returns:
             Дата создания в формате YYYY-MM-DD или None
         """
         try:
             # В Windows используется st_ctime, в Unix - st_birthtime (если доступно)
-            stat = os.stat(file_path)
-            
             # Попытка получить дату создания
-            if hasattr(stat, 'st_birthtime'):
+            if hasattr(st, 'st_birthtime'):
                 # macOS и некоторые версии Linux
-                timestamp = stat.st_birthtime
+                timestamp = st.st_birthtime
             else:
                 # Windows и другие системы (используем дату изменения как fallback)
-                timestamp = stat.st_ctime
+                timestamp = st.st_ctime
             
-            dt = datetime.fromtimestamp(timestamp)
-            return dt.strftime("%Y-%m-%d")
+            return time.strftime(_DATE_FMT, time.localtime(timestamp))
         except Exception as e:
             logger.debug(f"Не удалось извлечь дату создания {file_path}: {e}")
             return None
     
-    def _extract_date_modified(self, file_path: str) -> Optional[str]:
+    def _extract_date_modified(self, file_path: str, st: os.stat_result) -> Optional[str]:
         """Извлечение даты изменения файла.
         
         Args:
             file_path: Путь к файлу
+            st: Результат os.stat для файла
             
         Returns:
             Дата изменения в формате YYYY-MM-DD или None
         """
         try:
-            stat = os.stat(file_path)
-            timestamp = stat.st_mtime
-            dt = datetime.fromtimestamp(timestamp)
-            return dt.strftime("%Y-%m-%d")
+            return time.strftime(_DATE_FMT, time.localtime(st.st_mtime))
         except Exception as e:
             logger.debug(f"Не удалось извлечь дату изменения {file_path}: {e}")
             return None
     
-    def _extract_file_size(self, file_path: str) -> Optional[str]:
+    def _extract_file_size(self, file_path: str, st: os.stat_result) -> Optional[str]:
         """Извлечение размера файла.
         
         Args:
             file_path: Путь к файлу
+            st: Результат os.stat для файла
             
         Returns:
             Размер файла в отформатированном виде (B, KB, MB, GB) или None
         """
         try:
-            size = os.path.getsize(file_path)
+            size = st.st_size
             
             # Форматирование размера
             if size < 1024:
                 return f"{size}B"
-            elif size < 1024 * 1024:
-                return f"{size / 1024:.1f}KB"
-            elif size < 1024 * 1024 * 1024:
-                return f"{size / (1024 * 1024):.1f}MB"
-            else:
-                return f"{size / (1024 * 1024 * 1024):.1f}GB"
+            # Номер единицы - число полных групп по 10 бит в размере
+            unit_idx = min((size.bit_length() - 1) // 10, len(_SIZE_UNITS) - 1)
+            return f"{size / _SIZE_SCALES[unit_idx]:.1f}{_SIZE_UNITS[unit_idx]}"
         except Exception as e:
             logger.debug(f"Не удалось извлечь размер файла {file_path}: {e}")
             return None
     
-    def _get_audio_tags(self, file_path: str) -> Optional[object]:
+    def _get_audio_tags(self, file_path: str, st: os.stat_result) -> Optional[object]:
         """Получение тегов аудио файла с кэшированием.
         
         Args:
             file_path: Путь к аудио файлу
+            st: Результат os.stat для файла
             
         Returns:
             Объект тегов или None
@@ -259,44 +573,39 @@ class MetadataExtractor:
         if not self.mutagen_available:
             return None
         
+        key = _file_key(file_path, st)
+        
         # Проверяем кэш
-        if file_path in self._audio_cache:
-            return self._audio_cache[file_path]
+        if key in self._audio_cache:
+            self._audio_cache.move_to_end(key)
+            return self._audio_cache[key]
         
+        tags = None
         try:
-            audio_file = self.MutagenFile(file_path)
-            if audio_file is None:
-                self._audio_cache[file_path] = None
-                return None
-            
-            # Получаем теги
-            tags = audio_file.tags
-            if tags is None:
-                self._audio_cache[file_path] = None
-                return None
-            
-            # Кэшируем результат
-            self._audio_cache[file_path] = tags
-            return tags
-        except self.ID3NoHeaderError:
-            self._audio_cache[file_path] = None
-            return None
+            audio_file = MutagenFile(file_path)
+            if audio_file is not None:
+                # Получаем теги
+                tags = audio_file.tags
+        except ID3NoHeaderError:
+            pass
         except Exception as e:
             logger.debug(f"Не удалось извлечь аудио теги из {file_path}: {e}")
-            self._audio_cache[file_path] = None
-            return None
+        # Кэшируем результат (в том числе отсутствие тегов)
+        _cache_put(self._audio_cache, key, tags)
+        return tags
     
-    def _extract_audio_tag(self, file_path: str, tag_name: str) -> Optional[str]:
+    def _extract_audio_tag(self, file_path: str, st: os.stat_result, tag_name: str) -> Optional[str]:
         """Извлечение метаданных аудио файла.
         
         Args:
             file_path: Путь к аудио файлу
+            st: Результат os.stat для файла
             tag_name: Имя тега (artist, title, album, date, tracknumber, genre)
             
         Returns:
             Значение тега или None
         """
-        tags = self._get_audio_tags(file_path)
+        tags = self._get_audio_tags(file_path, st)
         if tags is None:
             return None
         
@@ -333,12 +642,13 @@ class MetadataExtractor:
             logger.debug(f"Не удалось извлечь аудио тег {tag_name} из {file_path}: {e}")
             return None
     
-    def _extract_custom_tag(self, tag: str, file_path: str) -> Optional[str]:
+    def _extract_custom_tag(self, tag: str, file_path: str, st: os.stat_result) -> Optional[str]:
         """Извлечение пользовательского тега (расширяемая функция).
         
         Args:
             tag: Тег для извлечения
             file_path: Путь к файлу
+            st: Результат os.stat для файла
             
         Returns:
             Значение тега или None
@@ -349,16 +659,19 @@ class MetadataExtractor:
         if not self.pillow_available:
             return None
         
+        tag_ids = _EXIF_TAG_IDS.get(tag[1:-1].lower())
+        if not tag_ids:
+            return None
+        
         # Используем кэшированные данные изображения
-        image_data = self._get_image_data(file_path)
+        image_data = self._get_image_data(file_path, st)
         if image_data:
             _, _, exifdata = image_data
             if exifdata:
                 # Поиск тега в EXIF данных
-                for tag_id, value in exifdata.items():
-                    tag_name = self.TAGS.get(tag_id, tag_id)
-                    if tag.lower() == f"{{{tag_name.lower()}}}":
-                        return str(value)
+                for tag_id in tag_ids:
+                    if tag_id in exifdata:
+                        return str(exifdata[tag_id])
         
         return None
 
@@ -13,6 +13,20 @@ from typing import Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
+# Паттерн нумерации с форматом ({n:03d}, {n:2d} и т.д.), компилируется один раз
+_NUM_FMT_RE = re.compile(r'\{n:0?(\d+)d\}')
+
+# Позиции добавления текста: True - в начало имени, False - в конец
+_ADD_AT_START = {"before": True, "start": True, "after": False, "end": False}
+
+# Функции изменения регистра по типу
+_CASE_FUNCS = {
+    "upper": str.upper,
+    "lower": str.lower,
+    "capitalize": str.capitalize,
+    "title": str.title,
+}
+
 
 class RenameMethod(ABC):
     """Базовый абстрактный класс для методов переименования.
@@ -24,6 +38,10 @@ class RenameMethod(ABC):
     в порядке их добавления в MethodsManager.
     """
     
+    # Подклассы объявляют свои __slots__: экземпляры без __dict__ компактнее,
+    # а чтение атрибутов в apply() быстрее
+    __slots__ = ()
+    
     @abstractmethod
     def apply(self, name: str, extension: str, file_path: str) -> Tuple[str, str]:
         """
@@ -43,6 +61,11 @@ class RenameMethod(ABC):
 class AddRemoveMethod(RenameMethod):
     """Метод добавления/удаления текста"""
     
+    __slots__ = (
+        'operation', 'text', 'position', 'remove_type', 'remove_start', 'remove_end',
+        '_prefix', '_suffix',
+    )
+    
     def __init__(
         self,
         operation: str,
@@ -67,6 +90,10 @@ class AddRemoveMethod(RenameMethod):
         self.remove_type = remove_type
         self.remove_start = remove_start
         self.remove_end = remove_end
+        # Позиция добавления разбирается один раз: apply только склеивает строки
+        at_start = _ADD_AT_START.get(position)
+        self._prefix = (text or "") if at_start is True else ""
+        self._suffix = (text or "") if at_start is False else ""
     
     def apply(self, name: str, extension: str, file_path: str) -> Tuple[str, str]:
         if self.operation == "add":
@@ -76,27 +103,8 @@ class AddRemoveMethod(RenameMethod):
     
     def _add_text(self, name: str, extension: str) -> Tuple[str, str]:
         """Добавление текста"""
-        if not self.text:
-            return name, extension
-        
-        if self.position == "before":
-            # Перед именем (но после расширения не добавляем)
-            new_name = self.text + name
-            return new_name, extension
-        elif self.position == "after":
-            # После имени (перед расширением)
-            new_name = name + self.text
-            return new_name, extension
-        elif self.position == "start":
-            # В начале всего имени
-            new_name = self.text + name
-            return new_name, extension
-        elif self.position == "end":
-            # В конце всего имени (перед расширением)
-            new_name = name + self.text
-            return new_name, extension
-        
-        return name, extension
+        # "before"/"start" - в начало имени, "after"/"end" - в конец (перед расширением)
+        return self._prefix + name + self._suffix, extension
     
     def _remove_text(self, name: str, extension: str) -> Tuple[str, str]:
         """Удаление текста"""
@@ -138,6 +146,8 @@ class AddRemoveMethod(RenameMethod):
 class ReplaceMethod(RenameMethod):
     """Метод замены текста"""
     
+    __slots__ = ('find', 'replace', 'case_sensitive', 'full_match', '_compiled_pattern', '_find_lower')
+    
     def __init__(self, find: str, replace: str, case_sensitive: bool = False,
                  full_match: bool = False):
         """
@@ -152,12 +162,12 @@ class ReplaceMethod(RenameMethod):
         self.case_sensitive = case_sensitive
         self.full_match = full_match
         # Кэшируем скомпилированный regex для регистронезависимой замены
+        # (экранированный текст всегда компилируется без ошибок)
         self._compiled_pattern = None
         if find and not case_sensitive and not full_match:
-            try:
-                self._compiled_pattern = re.compile(re.escape(find), re.IGNORECASE)
-            except re.error:
-                self._compiled_pattern = None
+            self._compiled_pattern = re.compile(re.escape(find), re.IGNORECASE)
+        # Искомый текст в нижнем регистре для регистронезависимого полного совпадения
+        self._find_lower = find.lower() if find else find
     
     def apply(self, name: str, extension: str, file_path: str) -> Tuple[str, str]:
         if not self.find:
@@ -171,7 +181,7 @@ class ReplaceMethod(RenameMethod):
                 else:
                     new_name = name
             else:
-                if name.lower() == self.find.lower():
+                if name.lower() == self._find_lower:
                     new_name = self.replace
                 else:
                     new_name = name
@@ -180,13 +190,11 @@ class ReplaceMethod(RenameMethod):
             if self.case_sensitive:
                 new_name = name.replace(self.find, self.replace)
             else:
-                # Регистронезависимая замена - используем кэшированный паттерн
-                if self._compiled_pattern:
-                    new_name = self._compiled_pattern.sub(self.replace, name)
-                else:
-                    # Fallback, если компиляция не удалась
-                    pattern = re.compile(re.escape(self.find), re.IGNORECASE)
-                    new_name = pattern.sub(self.replace, name)
+                # Регистронезависимая замена - используем кэшированный паттерн;
+                # имена без совпадений (обычный случай) возвращаются без sub()
+                if self._compiled_pattern.search(name) is None:
+                    return name, extension
+                new_name = self._compiled_pattern.sub(self.replace, name)
         
         return new_name, extension
 
@@ -194,6 +202,8 @@ class ReplaceMethod(RenameMethod):
 class CaseMethod(RenameMethod):
     """Метод изменения регистра"""
     
+    __slots__ = ('case_type', 'apply_to', '_name_fn', '_ext_fn')
+    
     def __init__(self, case_type: str, apply_to: str = "name"):
         """
         Args:
@@ -202,38 +212,25 @@ class CaseMethod(RenameMethod):
         """
         self.case_type = case_type
         self.apply_to = apply_to
+        # Функции преобразования выбираются один раз (None - часть не меняется)
+        case_fn = _CASE_FUNCS.get(case_type)
+        self._name_fn = case_fn if apply_to in ("name", "all") else None
+        self._ext_fn = case_fn if apply_to in ("ext", "all") else None
     
     def apply(self, name: str, extension: str, file_path: str) -> Tuple[str, str]:
-        new_name = name
-        new_ext = extension
-        
-        if self.apply_to == "name" or self.apply_to == "all":
-            if self.case_type == "upper":
-                new_name = name.upper()
-            elif self.case_type == "lower":
-                new_name = name.lower()
-            elif self.case_type == "capitalize":
-                new_name = name.capitalize()
-            elif self.case_type == "title":
-                new_name = name.title()
-        
-        if self.apply_to == "ext" or self.apply_to == "all":
-            if extension:
-                if self.case_type == "upper":
-                    new_ext = extension.upper()
-                elif self.case_type == "lower":
-                    new_ext = extension.lower()
-                elif self.case_type == "capitalize":
-                    new_ext = extension.capitalize()
-                elif self.case_type == "title":
-                    new_ext = extension.title()
-        
+        new_name = self._name_fn(name) if self._name_fn else name
+        new_ext = self._ext_fn(extension) if self._ext_fn and extension else extension
         return new_name, new_ext
 
 
 class NumberingMethod(RenameMethod):
     """Метод нумерации файлов"""
     
+    __slots__ = (
+        'start', 'step', 'digits', 'format_str', 'position', 'current_number',
+        '_number_template',
+    )
+    
     def __init__(
         self,
         start: int = 1,
@@ -256,11 +253,17 @@ class NumberingMethod(RenameMethod):
         self.format_str = format_str
         self.position = position
         self.current_number = start
+        # Шаблон str.format собирается один раз: каждый {n} становится полем
+        # с ведущими нулями, остальные фигурные скобки экранируются
+        number_field = "{0:0%dd}" % max(digits, 0)
+        self._number_template = number_field.join(
+            part.replace("{", "{{").replace("}", "}}")
+            for part in format_str.split("{n}")
+        )
     
     def apply(self, name: str, extension: str, file_path: str) -> Tuple[str, str]:
-        # Форматирование номера с ведущими нулями
-        number_str = str(self.current_number).zfill(self.digits)
-        formatted_number = self.format_str.replace("{n}", number_str)
+        # Форматирование номера с ведущими нулями одним вызовом
+        formatted_number = self._number_template.format(self.current_number)
         
         # Добавление номера
         if self.position == "start":
@@ -281,6 +284,8 @@ class NumberingMethod(RenameMethod):
 class MetadataMethod(RenameMethod):
     """Метод вставки метаданных"""
     
+    __slots__ = ('tag', 'position', 'extractor')
+    
     def __init__(self, tag: str, position: str = "end", extractor=None):
         """
         Args:
@@ -313,6 +318,8 @@ class MetadataMethod(RenameMethod):
 class RegexMethod(RenameMethod):
     """Метод переименования с использованием регулярных выражений"""
     
+    __slots__ = ('pattern', 'replace', 'compiled_pattern')
+    
     def __init__(self, pattern: str, replace: str):
         """
         Args:
@@ -344,6 +351,12 @@ class RegexMethod(RenameMethod):
 class NewNameMethod(RenameMethod):
     """Метод полной замены имени по шаблону"""
     
+    __slots__ = (
+        'template', 'metadata_extractor', 'start_number', 'file_number',
+        'number_format', 'required_metadata_tags', '_metadata_plan', '_tags_re',
+        '_has_ext', '_has_number',
+    )
+    
     def __init__(self, template: str, metadata_extractor=None, file_number: int = 1):
         """
         Args:
@@ -360,11 +373,33 @@ class NewNameMethod(RenameMethod):
         self.number_format = self._detect_number_format(template)
         # Предварительно определяем, какие метаданные теги используются в шаблоне
         self.required_metadata_tags = self._detect_metadata_tags(template)
+        # План извлечения метаданных разбирается один раз для всех файлов
+        self._metadata_plan = (
+            metadata_extractor.compile_tags(self.required_metadata_tags)
+            if metadata_extractor and self.required_metadata_tags else []
+        )
+        # Какие переменные есть в шаблоне - значения остальных не вычисляются
+        self._has_ext = "{ext}" in template
+        self._has_number = self.number_format['digits'] > 0 or "{n}" in template
+        # {ext}, номер и теги метаданных подставляются одним проходом регулярного
+        # выражения; длинные теги идут первыми, чтобы {width}x{height} не
+        # разбивался на части
+        patterns = [
+            re.escape(tag)
+            for tag in sorted((tag for tag, _ in self._metadata_plan), key=len, reverse=True)
+        ]
+        if self._has_ext:
+            patterns.append(re.escape("{ext}"))
+        if self._has_number:
+            patterns.append(
+                _NUM_FMT_RE.pattern if self.number_format['digits'] > 0 else re.escape("{n}")
+            )
+        self._tags_re = re.compile('|'.join(patterns)) if patterns else None
     
     def _detect_number_format(self, template: str) -> dict:
         """Определение формата нумерации из шаблона"""
         # Поиск паттернов типа {n:03d}, {n:02d} и т.д.
-        match = re.search(r'\{n:0?(\d+)d\}', template)
+        match = _NUM_FMT_RE.search(template)
         if match:
             digits = int(match.group(1))
             return {'format': f'{{:0{digits}d}}', 'digits': digits}
@@ -391,32 +426,25 @@ class NewNameMethod(RenameMethod):
         # Начинаем с шаблона - он полностью заменяет имя, если нет {name}
         new_name = self.template
         
-        # Заменяем переменные в фигурных скобках
-        # {ext} - расширение (без точки)
-        ext_without_dot = extension.lstrip('.') if extension else ""
-        new_name = new_name.replace("{ext}", ext_without_dot)
-        
-        # {n} - номер файла (с поддержкой формата {n:03d}, {n:02d} и т.д.)
-        if self.number_format['digits'] > 0:
-            # Форматирование с ведущими нулями
-            formatted_number = self.number_format['format'].format(self.file_number)
-            # Заменяем все варианты {n:XXd} на отформатированный номер
-            new_name = re.sub(r'\{n:0?\d+d\}', formatted_number, new_name)
-        else:
-            # Простая замена {n}
-            new_name = new_name.replace("{n}", str(self.file_number))
-        
-        # Метаданные (если доступны) - используем предварительно определенные теги
-        if self.metadata_extractor and self.required_metadata_tags:
-            # Извлекаем все необходимые метаданные за один проход
-            metadata_values = {}
-            for tag in self.required_metadata_tags:
-                value = self.metadata_extractor.extract(tag, file_path)
-                metadata_values[tag] = value or ""
+        # Значения переменных в фигурных скобках (только используемых в шаблоне)
+        if self._tags_re is not None:
+            # Метаданные (если доступны) - используем предварительно определенные теги
+            if self._metadata_plan:
+                # Извлекаем все необходимые метаданные за один проход
+                values = self.metadata_extractor.extract_many(self._metadata_plan, file_path)
+            else:
+                values = {}
+            if self._has_ext:
+                # {ext} - расширение (без точки)
+                values["{ext}"] = extension.lstrip('.') if extension else ""
+            # {n} - номер файла (все варианты {n:XXd} форматируются по первому из них)
+            number = (
+                self.number_format['format'].format(self.file_number)
+                if self._has_number else ""
+            )
             
-            # Заменяем все теги одним проходом
-            for tag, value in metadata_values.items():
-                new_name = new_name.replace(tag, value)
+            # Заменяем все теги одним проходом; совпадения вне словаря - теги номера
+            new_name = self._tags_re.sub(lambda m: values.get(m.group(0), number), new_name)
         
         # Условная логика в шаблонах: {if:condition:then:else}
         # Пример: {if:{ext}==jpg:IMG_{n}:FILE_{n}}
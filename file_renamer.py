@@ -28,15 +28,6 @@ try:
 except ImportError:
     pass
 
-HAS_PYSTRAY = False
-try:
-    import pystray
-    from pystray import MenuItem as item
-    from PIL import Image as PILImage
-    HAS_PYSTRAY = True
-except ImportError:
-    pass
-
 # Локальные импорты - core
 from core.file_operations import (
     add_file_to_list,
@@ -211,8 +202,8 @@ class FileRenamerApp:
         # Менеджеры настроек и шаблонов (нужно создать раньше для использования в теме)
         self.settings_manager = SettingsManager()
         self.settings = self.settings_manager.settings
+        # Файл шаблонов читается при первом обращении к saved_templates
         self.templates_manager = TemplatesManager()
-        self.saved_templates = self.templates_manager.templates
         
         # Настройка цветовой схемы и стилей
         self.style_manager = StyleManager()
@@ -416,17 +407,26 @@ class FileRenamerApp:
         """Загрузка настроек из файла"""
         return self.settings_manager.load_settings()
     
-    def save_settings(self, settings_dict):
-        """Сохранение настроек в файл"""
-        return self.settings_manager.save_settings(settings_dict)
+    def save_settings(self, settings_dict, wait=False):
+        """Сохранение настроек в файл (wait=True - сразу, с результатом записи)"""
+        return self.settings_manager.save_settings(settings_dict, wait)
     
     def load_templates(self):
         """Загрузка сохраненных шаблонов из файла"""
         return self.templates_manager.load_templates()
     
-    def save_templates(self):
-        """Сохранение шаблонов в файл"""
-        return self.templates_manager.save_templates(self.saved_templates)
+    def save_templates(self, wait=False):
+        """Сохранение шаблонов в файл (wait=True - сразу, с результатом записи)"""
+        return self.templates_manager.save_templates(self.saved_templates, wait)
+    
+    @property
+    def saved_templates(self):
+        """Сохраненные шаблоны (загружаются из файла при первом обращении)"""
+        return self.templates_manager.templates
+    
+    @saved_templates.setter
+    def saved_templates(self, value):
+        self.templates_manager.templates = value
     
     def setup_window_resize_handler(self, window, canvas=None, canvas_window=None):
         """Настройка обработчика изменения размера для окна с canvas"""
@@ -2422,11 +2422,13 @@ class FileRenamerApp:
                 
                 def install_thread():
                     success, message = self.library_manager.install_single_library(lib_name)
-                    self.root.after(0, lambda: messagebox.showinfo(
-                        "Результат установки" if success else "Ошибка",
-                        message
-                    ))
-                    self.root.after(0, refresh_libraries_table)
+                    
+                    def show_result():
+                        # Таблица и сообщение обновляются одним событием Tk
+                        refresh_libraries_table()
+                        messagebox.showinfo("Результат установки" if success else "Ошибка", message)
+                    
+                    self.root.after(0, show_result)
                 
                 threading.Thread(target=install_thread, daemon=True).start()
             
@@ -2460,11 +2462,13 @@ class FileRenamerApp:
                 
                 def uninstall_thread():
                     success, message = self.library_manager.uninstall_library(lib_name)
-                    self.root.after(0, lambda: messagebox.showinfo(
-                        "Результат удаления" if success else "Ошибка",
-                        message
-                    ))
-                    self.root.after(0, refresh_libraries_table)
+                    
+                    def show_result():
+                        # Таблица и сообщение обновляются одним событием Tk
+                        refresh_libraries_table()
+                        messagebox.showinfo("Результат удаления" if success else "Ошибка", message)
+                    
+                    self.root.after(0, show_result)
                 
                 threading.Thread(target=uninstall_thread, daemon=True).start()
             
@@ -3890,11 +3894,13 @@ class FileRenamerApp:
                 
                 def install_thread():
                     success, message = self.library_manager.install_single_library(lib_name)
-                    self.root.after(0, lambda: messagebox.showinfo(
-                        "Результат установки" if success else "Ошибка",
-                        message
-                    ))
-                    self.root.after(0, refresh_libraries_table)
+                    
+                    def show_result():
+                        # Таблица и сообщение обновляются одним событием Tk
+                        refresh_libraries_table()
+                        messagebox.showinfo("Результат установки" if success else "Ошибка", message)
+                    
+                    self.root.after(0, show_result)
                 
                 threading.Thread(target=install_thread, daemon=True).start()
             
@@ -3937,11 +3943,13 @@ class FileRenamerApp:
                 
                 def uninstall_thread():
                     success, message = self.library_manager.uninstall_library(lib_name)
-                    self.root.after(0, lambda: messagebox.showinfo(
-                        "Результат удаления" if success else "Ошибка",
-                        message
-                    ))
-                    self.root.after(0, refresh_libraries_table)
+                    
+                    def show_result():
+                        # Таблица и сообщение обновляются одним событием Tk
+                        refresh_libraries_table()
+                        messagebox.showinfo("Результат удаления" if success else "Ошибка", message)
+                    
+                    self.root.after(0, show_result)
                 
                 threading.Thread(target=uninstall_thread, daemon=True).start()
             
@@ -4005,7 +4013,8 @@ class FileRenamerApp:
                 'font_size': font_size_var.get(),
                 'backup': backup_var.get()
             }
-            if self.save_settings(settings_to_save):
+            # Явное сохранение записывается сразу, чтобы сообщить о результате
+            if self.save_settings(settings_to_save, wait=True):
                 self.settings.update(settings_to_save)
                 messagebox.showinfo("Настройки", "Настройки успешно сохранены!")
             else:
@@ -5656,11 +5665,10 @@ class FileRenamerApp:
                     'template': template,
                     'start_number': start_number
                 }
-                # Обновляем в менеджере шаблонов
-                self.templates_manager.templates = self.saved_templates
-                self.save_templates()
-                # Автосохранение шаблонов
-                self.templates_manager.save_templates(self.saved_templates)
+                # Записываем сразу, чтобы сообщить о результате
+                if not self.save_templates(wait=True):
+                    messagebox.showerror("Ошибка", "Не удалось сохранить шаблоны!")
+                    return
                 self.log(f"Шаблон '{template_name}' сохранен")
                 messagebox.showinfo("Успех", f"Шаблон '{template_name}' успешно сохранен!")
     
@@ -5727,10 +5735,10 @@ class FileRenamerApp:
             # Объединяем с существующими шаблонами
             self.saved_templates.update(new_templates)
             
-            # Сохраняем обновленные шаблоны
-            self.templates_manager.templates = self.saved_templates
-            self.save_templates()
-            self.templates_manager.save_templates(self.saved_templates)
+            # Сохраняем обновленные шаблоны сразу, чтобы сообщить о результате
+            if not self.save_templates(wait=True):
+                messagebox.showerror("Ошибка", "Не удалось сохранить шаблоны!")
+                return
             
             # Показываем результат
             message = f"Загружено шаблонов: {added_count}"
@@ -5863,11 +5871,10 @@ class FileRenamerApp:
                     template_name = sorted(self.saved_templates.keys())[selection[0]]
                     if messagebox.askyesno("Подтверждение", f"Удалить шаблон '{template_name}'?"):
                         del self.saved_templates[template_name]
-                        # Обновляем в менеджере шаблонов
-                        self.templates_manager.templates = self.saved_templates
-                        self.save_templates()
-                        # Автосохранение шаблонов
-                        self.templates_manager.save_templates(self.saved_templates)
+                        # Записываем сразу, чтобы сообщить о результате
+                        if not self.save_templates(wait=True):
+                            messagebox.showerror("Ошибка", "Не удалось сохранить шаблоны!")
+                            return
                         listbox.delete(selection[0])
                         self.log(f"Шаблон '{template_name}' удален")
                         if not self.saved_templates:
@@ -4,22 +4,345 @@
 Поддерживает кэширование результатов проверки для оптимизации производительности.
 """
 
+import functools
+import importlib.util
 import json
 import logging
 import os
+import queue
 import re
+import string
 import subprocess
 import sys
 import threading
 import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from datetime import datetime, timedelta
+from types import MappingProxyType
 import tkinter as tk
 from tkinter import messagebox, ttk
-from typing import List, Dict, Callable, Optional, Tuple
+from typing import List, Dict, Callable, Mapping, Optional, Tuple
+
+if sys.platform == 'win32':
+    import msvcrt
+else:
+    import fcntl
 
 logger = logging.getLogger(__name__)
 
 
+# Строка вывода pip о начале загрузки пакета: "Collecting <имя>..."
+_PIP_COLLECTING_RE = re.compile(r'\s*Collecting ([A-Za-z0-9_.\-]+)')
+
+# Строка прогресса загрузки при --progress-bar=raw: "Progress <байт> of <всего>"
+_PIP_RAW_PROGRESS_RE = re.compile(r'Progress (\d+) of (\d+)')
+
+# Версия pip в выводе "pip --version" и минимальная версия с --progress-bar=raw
+_PIP_VERSION_RE = re.compile(r'pip (\d+)\.(\d+)')
+_PIP_RAW_PROGRESS_MIN_VERSION = (24, 2)
+
+# Ключевые слова строк вывода pip, описывающих причину ошибки
+_ERR_RE = re.compile(
+    r'error|failed|не удалось|ошибка|exception|requirement|could not|no matching|'
+    r'building wheel|cmake|meson|visual studio|visual c\+\+|compiler|vcvarsall',
+    re.IGNORECASE
+)
+
+# Добавлен ли уже пользовательский site-packages в sys.path (см. _ensure_user_site)
+_user_site_added = False
+_user_site_lock = threading.Lock()
+
+# msgpack кодирует кэш быстрее и компактнее json; без него кэш хранится в JSON
+HAS_MSGPACK = False
+try:
+    import msgpack  # type: ignore
+    HAS_MSGPACK = True
+except ImportError:
+    pass
+
+# Префикс файла кэша в формате msgpack (файлы JSON начинаются с "{")
+_MSGPACK_CACHE_MAGIC = b'RPMP\x01'
+
+# Таблица удаления допустимых символов имени библиотеки (см. _is_valid_lib_name)
+_LIB_NAME_CHARS_TABLE = str.maketrans('', '', string.ascii_letters + string.digits + '_-')
+
+# Библиотеки, которые устанавливаются последними и без заранее загруженных
+# пакетов: pdf2docx требует предварительной установки зависимостей
+_SERIAL_INSTALL_LIBS = ('pdf2docx',)
+
+# Максимальное число потоков для параллельной проверки наличия библиотек
+_MAX_PROBE_WORKERS = 8
+
+# Размер буфера чтения/записи файла кэша проверки библиотек
+_CACHE_IO_BUFFER_SIZE = 64 * 1024
+
+# Пакеты, сборка которых из исходников требует компилятора: перед установкой
+# проверяем на PyPI наличие готового wheel для текущей платформы
+_COMPILE_PRONE_PACKAGES = ('numpy', 'PyMuPDF', 'pdf2docx')
+
+# Модули, наличие которых проверяется вместо имени импорта библиотеки:
+# подмодули с основным API и зависимости, без которых библиотека не работает
+_PROBE_MODULES = {
+    'win32com': ('win32com.client',),
+    'comtypes': ('comtypes.client',),
+    'moviepy': ('moviepy.editor',),
+    'pdf2docx': ('fitz', 'pdf2docx'),  # pdf2docx требует PyMuPDF (модуль fitz)
+}
+
+# Строки вывода pip о ходе установки, которые стоит показывать в логе
+_PIP_PROGRESS_PREFIXES = ('Collecting', 'Downloading', 'Installing', 'Successfully')
+
+# Общие флаги pip: без сетевой проверки новой версии pip, без ANSI-цветов
+# и без интерактивных запросов (вывод все равно читает программа)
+_PIP_COMMON_FLAGS = ('--disable-pip-version-check', '--no-color', '--no-input')
+
+
+def _normalize_dist_name(name: str) -> str:
+    """Нормализация имени пакета по правилам PEP 503.
+    
+    Args:
+        name: Имя пакета в любом регистре
+        
+    Returns:
+        Имя в нижнем регистре с разделителями "-"
+    """
+    return re.sub(r'[-_.]+', '-', name).lower()
+
+
+def _ensure_user_site():
+    """Однократное добавление пользовательского site-packages в sys.path.
+    
+    Библиотеки ставятся с --user, а при запуске Python мог не добавить
+    этот каталог (например, если он еще не существовал).
+    """
+    global _user_site_added
+    with _user_site_lock:
+        if _user_site_added:
+            return
+        try:
+            import site
+            user_site = site.getusersitepackages()
+            if user_site and user_site not in sys.path:
+                sys.path.insert(0, user_site)
+                site.addsitedir(user_site)
+        except Exception:
+            pass  # Игнорируем ошибки обновления пути
+        _user_site_added = True
+
+
+def _is_valid_lib_name(lib_name: str) -> bool:
+    """Проверка, что имя библиотеки можно безопасно передать в pip.
+    
+    Допустимы только латинские буквы, цифры, "_" и "-": str.translate
+    удаляет их за один проход, и непустой остаток означает недопустимый символ.
+    
+    Args:
+        lib_name: Имя библиотеки
+        
+    Returns:
+        True если имя непустое и состоит только из допустимых символов
+    """
+    return bool(lib_name) and not lib_name.translate(_LIB_NAME_CHARS_TABLE)
+
+
+def _extract_key_errors(output: str, limit: int) -> List[str]:
+    """Выбор из вывода pip строк, описывающих причину ошибки.
+    
+    Args:
+        output: Вывод pip
+        limit: Максимальное число строк
+        
+    Returns:
+        Первые limit строк, совпавших с _ERR_RE
+    """
+    key_errors = []
+    for line in output.splitlines():
+        if _ERR_RE.search(line):
+            key_errors.append(line.strip())
+            # Остаток длинного лога (сборка из исходников) не просматриваем
+            if len(key_errors) >= limit:
+                break
+    return key_errors
+
+
+def _is_module_available(module_name: str) -> bool:
+    """Проверка наличия модуля без его импорта.
+    
+    В отличие от import не выполняет код пакета (numpy, fitz загружаются
+    сотни миллисекунд), а только ищет его через механизм finder'ов.
+    
+    Args:
+        module_name: Имя модуля для импорта
+        
+    Returns:
+        True если модуль найден
+    """
+    try:
+        return importlib.util.find_spec(module_name) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+@functools.lru_cache(maxsize=None)
+def _probe(import_name: str) -> bool:
+    """Проверка наличия библиотеки по имени импорта.
+    
+    Результат запоминается до вызова _probe.cache_clear(), поэтому повторные
+    проверки одной библиотеки в течение работы программы не обращаются к
+    диску. Кэш очищается после установки и удаления библиотек.
+    
+    Args:
+        import_name: Имя для импорта
+        
+    Returns:
+        True если библиотека доступна
+    """
+    for module_name in _PROBE_MODULES.get(import_name, (import_name,)):
+        if not _is_module_available(module_name):
+            logger.debug(f"Модуль {module_name} не найден")
+            return False
+    return True
+
+
+def _wait_for_module(module_name: str, timeout: float = 2.0) -> bool:
+    """Ожидание появления только что установленного модуля.
+    
+    Вместо фиксированной паузы проверяет наличие модуля с экспоненциально
+    растущим интервалом и возвращается сразу, как только он найден.
+    
+    Args:
+        module_name: Имя модуля для импорта
+        timeout: Максимальное время ожидания в секундах
+        
+    Returns:
+        True если модуль найден до истечения времени ожидания
+    """
+    deadline = time.monotonic() + timeout
+    delay = 0.02
+    while True:
+        importlib.invalidate_caches()
+        if _is_module_available(module_name):
+            return True
+        if time.monotonic() >= deadline:
+            return False
+        time.sleep(delay)
+        delay = min(delay * 2, 0.2)
+
+
+def _invalidate_status(cache_data: Dict):
+    """Удаление из данных кэша результатов последней проверки библиотек.
+    
+    Args:
+        cache_data: Данные кэша (изменяются на месте)
+    """
+    cache_data.pop('last_check', None)
+    cache_data.pop('library_status', None)
+    cache_data.pop('verified_at', None)
+
+
+def _encode_cache(data: Dict) -> bytes:
+    """Сериализация данных кэша проверки библиотек.
+    
+    Args:
+        data: Словарь с данными кэша
+        
+    Returns:
+        msgpack с префиксом _MSGPACK_CACHE_MAGIC, если msgpack доступен,
+        иначе компактный JSON в UTF-8
+    """
+    if HAS_MSGPACK:
+        return _MSGPACK_CACHE_MAGIC + msgpack.packb(data, use_bin_type=True)
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def _decode_cache(payload: bytes) -> Dict:
+    """Десериализация данных кэша проверки библиотек.
+    
+    Формат определяется по префиксу, поэтому файлы JSON, записанные
+    раньше или без msgpack, продолжают читаться.
+    
+    Args:
+        payload: Содержимое файла кэша
+        
+    Returns:
+        Словарь с данными кэша
+        
+    Raises:
+        ValueError: Если файл записан в msgpack, а msgpack не установлен
+    """
+    if payload.startswith(_MSGPACK_CACHE_MAGIC):
+        if not HAS_MSGPACK:
+            raise ValueError("Кэш записан в формате msgpack, но msgpack не установлен")
+        return msgpack.unpackb(payload[len(_MSGPACK_CACHE_MAGIC):], raw=False)
+    return json.loads(payload.decode('utf-8'))
+
+
+def _flushes_cache(method: Callable) -> Callable:
+    """Декоратор публичных методов LibraryManager, меняющих кэш проверки.
+    
+    Все изменения кэша внутри вызова накапливаются в памяти и записываются
+    на диск одним вызовом flush() при выходе из метода.
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            self.flush()
+    return wrapper
+
+
+def _forget_installed_modules(import_names: List[str]):
+    """Сброс кэшей импорта после установки библиотек.
+    
+    importlib.invalidate_caches() заставляет finder'ы заново просмотреть
+    каталоги, поэтому обходить весь sys.modules не нужно: удаляется только
+    сам пакет верхнего уровня, если он был загружен ранее.
+    
+    Args:
+        import_names: Имена для импорта установленных библиотек
+    """
+    for import_name in import_names:
+        sys.modules.pop(import_name.split('.')[0], None)
+    importlib.invalidate_caches()
+    _probe.cache_clear()
+
+
+def _log_pip_progress(line: str):
+    """Запись в лог строк вывода pip о ходе установки.
+    
+    Args:
+        line: Строка вывода pip
+    """
+    stripped = line.strip()
+    if stripped.startswith(_PIP_PROGRESS_PREFIXES):
+        logger.info(f"  pip: {stripped}")
+
+
+def _get_pip_env() -> Dict[str, str]:
+    """Окружение для дочерних процессов pip.
+    
+    Дублирует флаги _PIP_COMMON_FLAGS через переменные окружения (они
+    действуют и на вложенные вызовы pip при сборке пакетов), отключает
+    предупреждение об устаревшей версии Python и запись .pyc во время
+    установки.
+    
+    Returns:
+        Копия os.environ с переменными PIP_* и PYTHONDONTWRITEBYTECODE
+    """
+    env = dict(os.environ)
+    env['PIP_DISABLE_PIP_VERSION_CHECK'] = '1'
+    env['PIP_NO_INPUT'] = '1'
+    # Только через окружение: в новых версиях pip флаг командной строки
+    # --no-python-version-warning удален, а неизвестные переменные PIP_*
+    # pip просто игнорирует
+    env['PIP_NO_PYTHON_VERSION_WARNING'] = '1'
+    env['PYTHONDONTWRITEBYTECODE'] = '1'
+    return env
+
+
 class LibraryManager:
     """Класс для управления установкой библиотек.
     
@@ -33,6 +356,7 @@ class LibraryManager:
         REQUIRED_LIBRARIES: Словарь обязательных библиотек {имя_пакета: имя_импорта}
         OPTIONAL_LIBRARIES: Словарь опциональных библиотек
         WINDOWS_OPTIONAL_LIBRARIES: Словарь Windows-специфичных библиотек
+        ALL_LIBRARIES: Неизменяемый словарь всех библиотек текущей платформы
     """
     
     # Обязательные библиотеки (нужны для базовой функциональности)
@@ -62,6 +386,20 @@ class LibraryManager:
         'pdf2docx': 'pdf2docx',  # Для конвертации PDF в DOCX
     }
     
+    # Все библиотеки для проверки на текущей платформе: списки не меняются во
+    # время работы, поэтому объединяются один раз при загрузке модуля
+    # (Windows-специфичные библиотеки добавляются только на Windows)
+    ALL_LIBRARIES = MappingProxyType({
+        **REQUIRED_LIBRARIES,
+        **OPTIONAL_LIBRARIES,
+        **(WINDOWS_OPTIONAL_LIBRARIES if sys.platform == 'win32' else {}),
+    })
+    
+    # Результаты проверки наличия wheel на PyPI {имя_пакета: есть_wheel}
+    _wheel_cache: Dict[str, bool] = {}
+    # Теги wheel, поддерживаемые текущим интерпретатором (вычисляются один раз)
+    _supported_wheel_tags: Optional[frozenset] = None
+    
     def __init__(self, root: tk.Tk, log_callback: Optional[Callable[[str], None]] = None):
         """Инициализация менеджера библиотек.
         
@@ -84,10 +422,101 @@ class LibraryManager:
                 except Exception:
                     pass
             self.libs_check_file = os.path.join(data_dir, "rename-plus_libs_installed.json")
-        # Время жизни кэша проверки библиотек (в днях)
-        self.cache_ttl_days = 7
+        # Файл межпроцессной блокировки записи в общий site-packages
+        self.install_lock_file = os.path.join(
+            os.path.dirname(self.libs_check_file), "rename-plus_install.lock"
+        )
+        # Каталог пакетов, загруженных pip download (см. _InstallerJob._download_wheels)
+        self.wheel_cache_dir = os.path.join(
+            os.path.dirname(self.libs_check_file), "wheels"
+        )
+        # Блокировка изменений sys.path/sys.modules и кэша внутри процесса
+        self._install_lock = threading.Lock()
+        # Данные файла кэша в памяти (см. _get_cache_data и flush)
+        self._cache: Optional[Dict] = None
+        self._cache_dirty = False
+        self._cache_lock = threading.Lock()
+        # Время жизни записей кэша проверки библиотек (в днях): для найденных
+        # и для отсутствующих библиотек
+        self.present_ttl_days = 30
+        self.missing_ttl_days = 1
+        # Таймер отложенной записи кэша (см. _append_installed_library)
+        self._flush_timer: Optional[threading.Timer] = None
+        # Очередь задач единственного фонового потока (см. _submit_background)
+        self._bg_tasks: "queue.Queue[Tuple[Callable, tuple]]" = queue.Queue()
+        self._bg_thread: Optional[threading.Thread] = None
+        self._bg_lock = threading.Lock()
+        # Версия pip (см. _get_pip_version)
+        self._pip_version: Optional[str] = None
         # Определяем, запущена ли программа в виртуальном окружении
         self.in_venv = self._is_in_venv()
+        # Пользовательский site-packages добавляется в sys.path один раз
+        # для всех последующих проверок библиотек
+        _ensure_user_site()
+    
+    @contextmanager
+    def _install_file_lock(self):
+        """Межпроцессная блокировка записи в общий site-packages.
+        
+        Под этой блокировкой выполняется каждый процесс, который пишет в
+        site-packages: pip install/uninstall и post-install скрипты (например,
+        регистрация pywin32). Так несколько установщиков (потоков или копий
+        программы) не записывают общие зависимости одновременно.
+        Блокировка не реентерабельна: вложенный вызов в том же процессе
+        заблокируется. Если файл блокировки недоступен, код выполняется
+        без блокировки.
+        """
+        lock_handle = None
+        try:
+            lock_handle = open(self.install_lock_file, 'a+b')
+            lock_handle.seek(0)
+            if sys.platform == 'win32':
+                msvcrt.locking(lock_handle.fileno(), msvcrt.LK_LOCK, 1)
+            else:
+                fcntl.flock(lock_handle, fcntl.LOCK_EX)
+        except OSError as e:
+            logger.debug(f"Не удалось получить блокировку установки: {e}")
+            if lock_handle is not None:
+                lock_handle.close()
+                lock_handle = None
+        try:
+            yield
+        finally:
+            if lock_handle is not None:
+                try:
+                    lock_handle.seek(0)
+                    if sys.platform == 'win32':
+                        msvcrt.locking(lock_handle.fileno(), msvcrt.LK_UNLCK, 1)
+                    else:
+                        fcntl.flock(lock_handle, fcntl.LOCK_UN)
+                except OSError:
+                    pass
+                lock_handle.close()
+    
+    @contextmanager
+    def _requirements_file(self, lib_names: List[str]):
+        """Временный файл требований для передачи списка библиотек в pip -r.
+        
+        pip не умеет читать требования из stdin ("-r -"), а /dev/stdin есть
+        только в POSIX, поэтому список записывается во временный файл,
+        который удаляется после выхода из блока.
+        
+        Args:
+            lib_names: Список библиотек
+            
+        Yields:
+            Путь к файлу требований
+        """
+        import tempfile
+        with tempfile.NamedTemporaryFile('w', suffix='.txt', delete=False, encoding='utf-8') as req_file:
+            req_file.write('\n'.join(lib_names) + '\n')
+        try:
+            yield req_file.name
+        finally:
+            try:
+                os.remove(req_file.name)
+            except OSError:
+                pass
     
     def _is_in_venv(self) -> bool:
         """Проверка, запущена ли программа в виртуальном окружении.
@@ -101,51 +530,336 @@ class LibraryManager:
         # Альтернативная проверка через переменную окружения
         return bool(os.environ.get('VIRTUAL_ENV'))
     
-    def _get_pip_install_args(self, package: str, upgrade: bool = True) -> List[str]:
+    def _submit_background(self, func: Callable, *args):
+        """Выполнение задачи в фоновом потоке менеджера.
+        
+        Все задачи (установка в фоне, установка из окна) выполняются по
+        очереди одним потоком, который создается при первой задаче и живет
+        до конца работы программы. Поток демонический, поэтому закрытие
+        программы не ждет завершения pip (в отличие от ThreadPoolExecutor,
+        чьи потоки присоединяются при выходе из интерпретатора).
+        
+        Args:
+            func: Функция для выполнения
+            *args: Аргументы функции
+        """
+        self._bg_tasks.put((func, args))
+        with self._bg_lock:
+            if self._bg_thread is None or not self._bg_thread.is_alive():
+                self._bg_thread = threading.Thread(
+                    target=self._background_loop, name='libmgr-bg', daemon=True
+                )
+                self._bg_thread.start()
+    
+    def _background_loop(self):
+        """Цикл фонового потока: выполнение задач из очереди по одной."""
+        while True:
+            func, args = self._bg_tasks.get()
+            try:
+                func(*args)
+            except Exception as e:
+                logger.error(f"Ошибка фоновой задачи {getattr(func, '__name__', func)}: {e}", exc_info=True)
+    
+    def _activate_installed_module(self, lib_name: str) -> bool:
+        """Подготовка только что установленной библиотеки к импорту.
+        
+        Сбрасывает кэши импорта (ранее загруженный пакет, finder'ы, результаты
+        _probe) и ждет, пока модуль станет находиться через find_spec. Сам
+        модуль не импортируется: его код выполнится при первом использовании.
+        
+        Args:
+            lib_name: Имя установленной библиотеки
+            
+        Returns:
+            True если модуль библиотеки найден
+        """
+        import_name = self.get_all_libraries().get(lib_name)
+        if not import_name:
+            return False
+        with self._install_lock:
+            _forget_installed_modules([import_name])
+        return _wait_for_module(import_name)
+    
+    def _get_pip_version(self) -> Optional[str]:
+        """Получение версии pip текущего интерпретатора.
+        
+        Версия читается импортом пакета pip (его __init__ не загружает
+        внутренние модули) вместо запуска "python -m pip --version" и
+        запоминается на время работы программы.
+        
+        Returns:
+            Строка версии pip или None, если pip не установлен
+        """
+        if self._pip_version is None:
+            try:
+                import pip  # type: ignore
+                self._pip_version = pip.__version__
+            except Exception as e:
+                logger.debug(f"pip не доступен: {e}")
+                return None
+        return self._pip_version
+    
+    def _get_pip_install_args(self, *packages: str, upgrade: bool = True) -> List[str]:
         """Получение аргументов для команды pip install.
         
         Args:
-            package: Имя пакета для установки
+            packages: Имена пакетов для установки (один или несколько)
             upgrade: Обновлять ли пакет если уже установлен
             
         Returns:
             Список аргументов для pip install
         """
-        args = [sys.executable, "-m", "pip", "install", package]
+        args = [sys.executable, "-m", "pip", "install", *packages]
         if upgrade:
             args.append("--upgrade")
         # Используем --user только если НЕ в виртуальном окружении
         if not self.in_venv:
             args.append("--user")
+        args.extend(_PIP_COMMON_FLAGS)
+        # Байткод компилируется одним вызовом compile_installed_packages после
+        # установки (или лениво при первом импорте), а не последовательно в pip
+        args.append("--no-compile")
         args.append("--no-warn-script-location")
         return args
     
-    def get_all_libraries(self) -> Dict[str, str]:
-        """Получение всех библиотек для проверки.
+    def _has_matching_wheel(self, lib: str) -> bool:
+        """Проверка наличия на PyPI готового wheel пакета для текущей платформы.
+        
+        Один запрос к JSON API PyPI избавляет от заведомо неудачного вызова
+        pip, который мог бы минутами собирать пакет из исходников.
         
+        Args:
+            lib: Имя пакета на PyPI
+            
         Returns:
-            Словарь {имя_пакета: имя_импорта}
+            False только если последний релиз точно не содержит подходящего
+            wheel; при любой ошибке проверки - True (решение остается за pip)
         """
-        all_libs = {}
-        all_libs.update(self.REQUIRED_LIBRARIES)
-        all_libs.update(self.OPTIONAL_LIBRARIES)
+        if lib in self._wheel_cache:
+            return self._wheel_cache[lib]
         
-        # Добавляем Windows-специфичные библиотеки только на Windows
-        if sys.platform == 'win32':
-            all_libs.update(self.WINDOWS_OPTIONAL_LIBRARIES)
+        # Теги совместимости wheel дает packaging (или его копия внутри pip);
+        # импорт дорогой и нужен только при установке, поэтому он здесь.
+        # Если ни то ни другое не доступно - проверка отключается
+        try:
+            from packaging import tags as packaging_tags
+        except ImportError:
+            try:
+                from pip._vendor.packaging import tags as packaging_tags  # type: ignore
+            except ImportError:
+                return True
         
-        return all_libs
+        try:
+            if LibraryManager._supported_wheel_tags is None:
+                LibraryManager._supported_wheel_tags = frozenset(
+                    str(tag) for tag in packaging_tags.sys_tags()
+                )
+            # Сетевой стек нужен только при установке, импортируем его здесь
+            import urllib.parse
+            import urllib.request
+            url = f"https://pypi.org/pypi/{urllib.parse.quote(lib)}/json"
+            with urllib.request.urlopen(url, timeout=5) as response:
+                data = json.loads(response.read())
+        except Exception as e:
+            logger.debug(f"Не удалось проверить наличие wheel для {lib}: {e}")
+            return True
+        
+        has_wheel = False
+        for file_info in data.get('urls', []):
+            filename = file_info.get('filename', '')
+            if file_info.get('packagetype') != 'bdist_wheel' or not filename.endswith('.whl'):
+                continue
+            # Имя файла: <имя>-<версия>[-<сборка>]-<python>-<abi>-<платформа>.whl,
+            # каждая часть тега может содержать несколько значений через точку
+            parts = filename[:-4].split('-')
+            if len(parts) < 5:
+                continue
+            python_tags, abi_tags, platform_tags = (part.split('.') for part in parts[-3:])
+            if any(f"{py}-{abi}-{plat}" in self._supported_wheel_tags
+                   for py in python_tags for abi in abi_tags for plat in platform_tags):
+                has_wheel = True
+                break
+        
+        self._wheel_cache[lib] = has_wheel
+        return has_wheel
+    
+    def _get_installed_distributions(self) -> Optional[set]:
+        """Получение имен всех установленных пакетов одним вызовом pip list.
+        
+        Returns:
+            Множество нормализованных (PEP 503) имен пакетов или None,
+            если получить список не удалось
+        """
+        try:
+            result = subprocess.run(
+                [sys.executable, '-m', 'pip', 'list', '--format=json', *_PIP_COMMON_FLAGS],
+                capture_output=True,
+                env=_get_pip_env(),
+                text=True,
+                timeout=30
+            )
+            if result.returncode != 0:
+                logger.debug(f"pip list завершился с ошибкой: {result.stderr[:200]}")
+                return None
+            return {_normalize_dist_name(pkg['name']) for pkg in json.loads(result.stdout)}
+        except (subprocess.SubprocessError, OSError, ValueError, KeyError, TypeError) as e:
+            logger.debug(f"Не удалось получить список установленных пакетов: {e}")
+            return None
+    
+    def _run_pip_stream(self, cmd: List[str], timeout: float,
+                        on_line: Optional[Callable[[str], None]] = None) -> Tuple[int, str]:
+        """Запуск pip с построчным чтением вывода.
+        
+        В отличие от subprocess.run(capture_output=True) вывод доступен
+        сразу, поэтому окно установки показывает реальный прогресс.
+        
+        Args:
+            cmd: Команда для запуска (pip или вспомогательный скрипт)
+            timeout: Максимальное время выполнения в секундах
+            on_line: Функция, вызываемая для каждой строки вывода
+            
+        Returns:
+            Кортеж (код возврата, последние строки вывода для диагностики)
+            
+        Raises:
+            subprocess.TimeoutExpired: Если процесс не завершился за timeout
+        """
+        tail = deque(maxlen=30)
+        proc = subprocess.Popen(
+            cmd,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            env=_get_pip_env(),
+            text=True,
+            bufsize=1
+        )
+        timed_out = threading.Event()
+        
+        def kill_on_timeout():
+            timed_out.set()
+            proc.kill()
+        
+        timer = threading.Timer(timeout, kill_on_timeout)
+        timer.start()
+        try:
+            for line in proc.stdout:
+                tail.append(line)
+                if on_line is not None:
+                    on_line(line)
+            proc.wait()
+        finally:
+            timer.cancel()
+            proc.stdout.close()
+        
+        if timed_out.is_set():
+            raise subprocess.TimeoutExpired(cmd, timeout)
+        return proc.returncode, ''.join(tail)
+    
+    def _site_packages_dir(self) -> Optional[str]:
+        """Каталог, в который pip устанавливает пакеты.
+        
+        Returns:
+            purelib окружения (в venv) или пользовательский site-packages
+        """
+        if self.in_venv:
+            import sysconfig
+            return sysconfig.get_paths()['purelib']
+        import site
+        return site.getusersitepackages()
+    
+    def compile_installed_packages(self, since: float, timeout: float = 600) -> bool:
+        """Компиляция байткода пакетов, установленных после момента since.
+        
+        pip запускается с --no-compile, поэтому .pyc создаются здесь одним
+        процессом compileall на всех ядрах (-j 0). Компилируются только
+        файлы из RECORD тех dist-info, которые появились (или обновились)
+        во время установки, включая зависимости, а не весь site-packages.
+        
+        Args:
+            since: Время начала установки (time.time())
+            timeout: Максимальное время компиляции в секундах
+            
+        Returns:
+            True если компилировать нечего или компиляция завершилась успешно
+        """
+        target = self._site_packages_dir()
+        if not target or not os.path.isdir(target):
+            return False
+        
+        paths = set()
+        try:
+            with os.scandir(target) as entries:
+                for entry in entries:
+                    if not (entry.name.endswith('.dist-info') and entry.is_dir()):
+                        continue
+                    # Запас в секунду на грубое разрешение времени файловой системы
+                    if entry.stat().st_mtime < since - 1:
+                        continue
+                    try:
+                        with open(os.path.join(entry.path, 'RECORD'), encoding='utf-8') as record:
+                            for line in record:
+                                rel_path = line.split(',', 1)[0]
+                                # Скрипты вне site-packages (../../bin) не компилируем
+                                if rel_path.endswith('.py') and not rel_path.startswith('..'):
+                                    paths.add(os.path.join(target, rel_path.split('/', 1)[0]))
+                    except OSError:
+                        continue
+        except OSError as e:
+            logger.debug(f"Не удалось прочитать {target}: {e}")
+            return False
+        
+        paths = sorted(path for path in paths if os.path.exists(path))
+        if not paths:
+            return True
+        try:
+            # compileall записывает __pycache__ в site-packages
+            with self._install_file_lock():
+                result = subprocess.run(
+                    [sys.executable, '-m', 'compileall', '-q', '-j', '0', *paths],
+                    capture_output=True,
+                    text=True,
+                    timeout=timeout
+                )
+            return result.returncode == 0
+        except (subprocess.SubprocessError, OSError) as e:
+            logger.debug(f"Не удалось скомпилировать байткод в {target}: {e}")
+            return False
+    
+    def get_all_libraries(self) -> Mapping[str, str]:
+        """Получение всех библиотек для проверки.
+        
+        Returns:
+            Неизменяемый словарь {имя_пакета: имя_импорта}
+        """
+        return self.ALL_LIBRARIES
     
     def _get_cache_data(self) -> Dict:
         """Получение данных кэша.
         
+        Файл читается только при первом обращении, дальше возвращается
+        словарь, хранящийся в памяти.
+        
         Returns:
             Словарь с данными кэша
         """
+        with self._cache_lock:
+            if self._cache is None:
+                self._cache = self._load_cache_file()
+            return self._cache
+    
+    def _load_cache_file(self) -> Dict:
+        """Чтение данных кэша из файла.
+        
+        Returns:
+            Словарь с данными кэша или пустой словарь, если файла нет
+        """
+        # При первом запуске файла нет: одна неудачная попытка открытия вместо
+        # отдельной проверки существования, дальше работает кэш в памяти
         try:
-            if os.path.exists(self.libs_check_file):
-                with open(self.libs_check_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
+            with open(self.libs_check_file, 'rb', buffering=_CACHE_IO_BUFFER_SIZE) as f:
+                return _decode_cache(f.read())
+        except FileNotFoundError:
+            logger.debug("Файл кэша проверки библиотек не найден (первый запуск)")
         except Exception:
             pass
         return {}
@@ -153,37 +867,111 @@ class LibraryManager:
     def _save_cache_data(self, data: Dict):
         """Сохранение данных кэша.
         
+        Данные только обновляются в памяти, на диск их записывает flush()
+        при выходе из публичного метода.
+        
+        Args:
+            data: Словарь с данными для сохранения
+        """
+        with self._cache_lock:
+            self._cache = data
+            self._cache_dirty = True
+    
+    def flush(self):
+        """Запись изменённых данных кэша на диск."""
+        with self._cache_lock:
+            if self._cache_dirty and self._cache is not None:
+                self._write_cache_file(self._cache)
+                self._cache_dirty = False
+    
+    def _write_cache_file(self, data: Dict):
+        """Запись данных кэша в файл.
+        
         Args:
             data: Словарь с данными для сохранения
         """
+        # Файл читает только программа: пишем его содержимое одним вызовом
+        # во временный файл и атомарно заменяем им старый, чтобы сбой посреди
+        # записи не оставил повреждённый кэш. fsync перед заменой гарантирует,
+        # что после сбоя питания под новым именем не окажется пустой файл.
+        # Имя временного файла включает PID, чтобы две копии программы
+        # не писали в один и тот же файл
+        tmp_file = f"{self.libs_check_file}.{os.getpid()}.tmp"
         try:
-            with open(self.libs_check_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
+            payload = _encode_cache(data)
+            with open(tmp_file, 'wb', buffering=_CACHE_IO_BUFFER_SIZE) as f:
+                f.write(payload)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_file, self.libs_check_file)
         except Exception:
-            pass
+            try:
+                os.remove(tmp_file)
+            except OSError:
+                pass
     
-    def _is_cache_valid(self, cache_data: Dict) -> bool:
-        """Проверка валидности кэша.
+    def _make_status_entry(self, present: bool, checked_at: str) -> Dict:
+        """Создание записи кэша о результате проверки одной библиотеки.
+        
+        Установленные библиотеки удаляются редко, поэтому результат для них
+        хранится дольше; отсутствующие проверяются чаще, так как пользователь
+        мог установить их вручную.
         
         Args:
-            cache_data: Данные кэша
+            present: Найдена ли библиотека
+            checked_at: Время проверки в формате ISO
             
         Returns:
-            True если кэш валиден, False иначе
+            Словарь {present, checked_at, ttl_days}
         """
-        if 'last_check' not in cache_data:
+        return {
+            'present': present,
+            'checked_at': checked_at,
+            'ttl_days': self.present_ttl_days if present else self.missing_ttl_days,
+        }
+    
+    def _is_status_entry_valid(self, entry, now: datetime) -> bool:
+        """Проверка, не истёк ли срок действия записи кэша о библиотеке.
+        
+        Args:
+            entry: Запись из cache_data['library_status']
+            now: Текущее время
+            
+        Returns:
+            True если запись действительна, False иначе
+        """
+        if not isinstance(entry, dict):
             return False
         
         try:
-            last_check_str = cache_data['last_check']
-            last_check = datetime.fromisoformat(last_check_str)
-            cache_age = datetime.now() - last_check
-            
-            # Кэш действителен если прошло меньше дней, чем TTL
-            return cache_age < timedelta(days=self.cache_ttl_days)
-        except (ValueError, KeyError):
+            checked_at = datetime.fromisoformat(entry['checked_at'])
+            # Запись действительна если прошло меньше дней, чем ее TTL
+            return now - checked_at < timedelta(days=entry['ttl_days'])
+        except (ValueError, KeyError, TypeError):
+            return False
+    
+    def _is_installed_list_verified(self) -> bool:
+        """Проверка, сверялся ли недавно список установленных библиотек с диском.
+        
+        Returns:
+            True если с момента проверки прошло меньше present_ttl_days дней
+        """
+        verified_at = self._get_cache_data().get('verified_at')
+        if not verified_at:
+            return False
+        try:
+            age = datetime.now() - datetime.fromisoformat(verified_at)
+        except (ValueError, TypeError):
             return False
+        return age < timedelta(days=self.present_ttl_days)
     
+    def _mark_installed_list_verified(self):
+        """Запоминание времени проверки списка установленных библиотек."""
+        cache_data = self._get_cache_data()
+        cache_data['verified_at'] = datetime.now().isoformat()
+        self._save_cache_data(cache_data)
+    
+    @_flushes_cache
     def check_libraries(self, check_optional: bool = True, use_cache: bool = True) -> Dict[str, List[str]]:
         """Проверка наличия библиотек.
         
@@ -194,133 +982,78 @@ class LibraryManager:
         Returns:
             Словарь с ключами 'required' и 'optional', содержащий списки отсутствующих библиотек
         """
-        # Обновляем sys.path для обнаружения установленных библиотек
-        try:
-            import site
-            user_site = site.getusersitepackages()
-            if user_site and user_site not in sys.path:
-                sys.path.insert(0, user_site)
-                site.addsitedir(user_site)
-        except Exception:
-            pass
-        
         cache_data = self._get_cache_data()
         
         # Получаем список установленных библиотек из кэша
         installed_libs = set(cache_data.get('installed', []))
         
-        # Если кэш валиден и мы хотим его использовать
-        if use_cache and self._is_cache_valid(cache_data) and 'library_status' in cache_data:
+        libs_to_check = dict(self.REQUIRED_LIBRARIES)
+        if check_optional:
+            libs_to_check.update(self.OPTIONAL_LIBRARIES)
+            # Windows-специфичные библиотеки проверяем только на Windows
+            if sys.platform == 'win32':
+                libs_to_check.update(self.WINDOWS_OPTIONAL_LIBRARIES)
+        
+        # Записи старого формата (списки отсутствующих библиотек) отбрасываются
+        cached_status = cache_data.get('library_status')
+        if not isinstance(cached_status, dict):
+            cached_status = {}
+        library_status = {
+            lib_name: entry for lib_name, entry in cached_status.items()
+            if isinstance(entry, dict)
+        }
+        
+        now = datetime.now()
+        results = {}
+        libs_to_probe = {}
+        for lib_name, import_name in libs_to_check.items():
+            entry = library_status.get(lib_name)
+            # Библиотеку, помеченную как установленная, но отсутствовавшую
+            # при прошлой проверке, проверяем заново
+            if (use_cache and self._is_status_entry_valid(entry, now)
+                    and (entry['present'] or lib_name not in installed_libs)):
+                results[lib_name] = entry['present']
+            else:
+                libs_to_probe[lib_name] = import_name
+        
+        if libs_to_probe:
+            # Проверки упираются в обращения к файловой системе, а не в CPU,
+            # поэтому выполняем их параллельно в потоках
+            with ThreadPoolExecutor(max_workers=min(_MAX_PROBE_WORKERS, len(libs_to_probe))) as executor:
+                probed = dict(zip(
+                    libs_to_probe,
+                    executor.map(lambda item: self._check_library(*item), libs_to_probe.items())
+                ))
+            checked_at = now.isoformat()
+            for lib_name, is_available in probed.items():
+                library_status[lib_name] = self._make_status_entry(is_available, checked_at)
+            results.update(probed)
+        else:
             logger.debug("Используется кэш проверки библиотек")
-            cached_status = cache_data['library_status']
-            
-            # Проверяем только те библиотеки, которые были отмечены как отсутствующие
-            # Но исключаем те, которые уже помечены как установленные
-            missing_required = []
-            missing_optional = []
-            
-            # Проверяем обязательные библиотеки из кэша
-            for lib_name in cached_status.get('missing_required', []):
-                # Пропускаем библиотеки, которые уже помечены как установленные
-                if lib_name in installed_libs:
-                    # Но проверяем, действительно ли они установлены
-                    import_name = self.REQUIRED_LIBRARIES.get(lib_name)
-                    if import_name and self._check_library(lib_name, import_name):
-                        # Библиотека действительно установлена, оставляем в списке установленных
-                        continue
-                    else:
-                        # Библиотека помечена как установленная, но не найдена - удаляем из списка
-                        installed_libs.discard(lib_name)
-                        missing_required.append(lib_name)
-                        continue
-                import_name = self.REQUIRED_LIBRARIES.get(lib_name)
-                if import_name and not self._check_library(lib_name, import_name):
-                    missing_required.append(lib_name)
-            
-            if check_optional:
-                # Проверяем опциональные библиотеки из кэша
-                for lib_name in cached_status.get('missing_optional', []):
-                    # Пропускаем библиотеки, которые уже помечены как установленные
-                    if lib_name in installed_libs:
-                        # Но проверяем, действительно ли они установлены
-                        import_name = (self.OPTIONAL_LIBRARIES.get(lib_name) or 
-                                     (self.WINDOWS_OPTIONAL_LIBRARIES.get(lib_name) if sys.platform == 'win32' else None))
-                        if import_name and self._check_library(lib_name, import_name):
-                            # Библиотека действительно установлена, оставляем в списке установленных
-                            continue
-                        else:
-                            # Библиотека помечена как установленная, но не найдена - удаляем из списка
-                            installed_libs.discard(lib_name)
-                            missing_optional.append(lib_name)
-                            continue
-                    import_name = (self.OPTIONAL_LIBRARIES.get(lib_name) or 
-                                 (self.WINDOWS_OPTIONAL_LIBRARIES.get(lib_name) if sys.platform == 'win32' else None))
-                    if import_name and not self._check_library(lib_name, import_name):
-                        missing_optional.append(lib_name)
-            
-            # Обновляем список установленных библиотек, если что-то изменилось
-            if installed_libs != set(cache_data.get('installed', [])):
-                cache_data['installed'] = list(installed_libs)
-                self._save_cache_data(cache_data)
-            
-            return {
-                'required': missing_required,
-                'optional': missing_optional
-            }
         
-        # Полная проверка всех библиотек
         missing_required = []
         missing_optional = []
-        
-        # Проверяем обязательные библиотеки
-        for lib_name, import_name in self.REQUIRED_LIBRARIES.items():
-            # Пропускаем библиотеки, которые уже помечены как установленные
-            if lib_name in installed_libs:
-                # Но все равно проверяем, действительно ли они установлены
-                if not self._check_library(lib_name, import_name):
-                    # Если библиотека помечена как установленная, но не найдена, удаляем из списка
-                    installed_libs.discard(lib_name)
-                    missing_required.append(lib_name)
-            elif not self._check_library(lib_name, import_name):
+        for lib_name, is_available in results.items():
+            if is_available:
+                continue
+            # Если библиотека помечена как установленная, но не найдена, удаляем из списка
+            installed_libs.discard(lib_name)
+            if lib_name in self.REQUIRED_LIBRARIES:
                 missing_required.append(lib_name)
+            else:
+                missing_optional.append(lib_name)
         
-        if check_optional:
-            # Проверяем опциональные библиотеки
-            for lib_name, import_name in self.OPTIONAL_LIBRARIES.items():
-                # Пропускаем библиотеки, которые уже помечены как установленные
-                if lib_name in installed_libs:
-                    # Но все равно проверяем, действительно ли они установлены
-                    if not self._check_library(lib_name, import_name):
-                        # Если библиотека помечена как установленная, но не найдена, удаляем из списка
-                        installed_libs.discard(lib_name)
-                        missing_optional.append(lib_name)
-                elif not self._check_library(lib_name, import_name):
-                    missing_optional.append(lib_name)
-            
-            # Проверяем Windows-специфичные библиотеки
-            if sys.platform == 'win32':
-                for lib_name, import_name in self.WINDOWS_OPTIONAL_LIBRARIES.items():
-                    # Пропускаем библиотеки, которые уже помечены как установленные
-                    if lib_name in installed_libs:
-                        # Но все равно проверяем, действительно ли они установлены
-                        if not self._check_library(lib_name, import_name):
-                            # Если библиотека помечена как установленная, но не найдена, удаляем из списка
-                            installed_libs.discard(lib_name)
-                            missing_optional.append(lib_name)
-                    elif not self._check_library(lib_name, import_name):
-                        missing_optional.append(lib_name)
-        
-        # Обновляем список установленных библиотек, если что-то изменилось
+        # Сохраняем в кэш только изменившиеся данные
+        changed = False
         if installed_libs != set(cache_data.get('installed', [])):
             cache_data['installed'] = list(installed_libs)
-        
-        # Сохраняем результаты в кэш
-        cache_data['last_check'] = datetime.now().isoformat()
-        cache_data['library_status'] = {
-            'missing_required': missing_required,
-            'missing_optional': missing_optional
-        }
-        self._save_cache_data(cache_data)
+            changed = True
+        if libs_to_probe or library_status != cached_status:
+            cache_data['last_check'] = now.isoformat()
+            cache_data['library_status'] = library_status
+            changed = True
+        if changed:
+            self._save_cache_data(cache_data)
         
         return {
             'required': missing_required,
@@ -337,102 +1070,9 @@ class LibraryManager:
         Returns:
             True если библиотека доступна, False иначе
         """
-        try:
-            # Обновляем sys.path перед проверкой
-            try:
-                import site
-                user_site = site.getusersitepackages()
-                if user_site and user_site not in sys.path:
-                    sys.path.insert(0, user_site)
-                    site.addsitedir(user_site)
-            except Exception:
-                pass  # Игнорируем ошибки обновления пути
-            
-            # Очищаем кэш импортов для этой библиотеки перед проверкой
-            # Это помогает найти библиотеки, которые были только что установлены
-            modules_to_remove = [m for m in list(sys.modules.keys()) if m.startswith(import_name)]
-            for m in modules_to_remove:
-                try:
-                    del sys.modules[m]
-                except KeyError:
-                    pass
-            
-            # Специальная обработка для win32com
-            if import_name == 'win32com':
-                try:
-                    import win32com.client  # type: ignore
-                    return True
-                except (ImportError, AttributeError):
-                    return False
-            
-            # Специальная обработка для comtypes
-            if import_name == 'comtypes':
-                try:
-                    import comtypes.client  # type: ignore
-                    return True
-                except (ImportError, AttributeError):
-                    return False
-            
-            # Специальная обработка для moviepy
-            if import_name == 'moviepy':
-                try:
-                    from moviepy.editor import VideoFileClip  # type: ignore
-                    return True
-                except (ImportError, AttributeError):
-                    return False
-            
-            # Специальная обработка для pdf2docx
-            if import_name == 'pdf2docx':
-                try:
-                    # pdf2docx требует PyMuPDF (модуль fitz)
-                    try:
-                        import fitz  # type: ignore
-                    except ImportError:
-                        # PyMuPDF не установлен, но pdf2docx может быть установлен
-                        logger.debug("pdf2docx требует PyMuPDF (fitz), но он не установлен")
-                        return False
-                    from pdf2docx import Converter  # type: ignore
-                    return True
-                except (ImportError, AttributeError) as e:
-                    logger.debug(f"Ошибка импорта pdf2docx: {e}")
-                    return False
-            
-            # Специальная обработка для PIL (Pillow)
-            if import_name == 'PIL':
-                try:
-                    from PIL import Image  # type: ignore
-                    return True
-                except (ImportError, AttributeError):
-                    return False
-            
-            # Специальная обработка для pydub
-            if import_name == 'pydub':
-                try:
-                    import pydub  # type: ignore
-                    # Проверяем что модуль действительно загружен
-                    if hasattr(pydub, 'AudioSegment'):
-                        return True
-                    return False
-                except (ImportError, AttributeError):
-                    return False
-            
-            # Обычная проверка для остальных библиотек
-            module = __import__(import_name)
-            # Дополнительная проверка: убеждаемся что модуль действительно загружен
-            if module is None:
-                return False
-            return True
-        except ImportError:
-            return False
-        except ModuleNotFoundError:
-            return False
-        except Exception as e:
-            # Для некоторых библиотек могут быть другие исключения
-            if "ImportError" in str(type(e)) or "ModuleNotFoundError" in str(type(e)):
-                return False
-            # Логируем неожиданные ошибки, но считаем библиотеку недоступной
-            logger.debug(f"Неожиданная ошибка при проверке {lib_name} ({import_name}): {e}")
-            return False
+        # find_spec только ищет модуль, не выполняя код пакета, поэтому
+        # очищать sys.modules перед проверкой больше не нужно
+        return _probe(import_name)
     
     def get_installed_libraries(self) -> List[str]:
         """Получение списка ранее установленных библиотек.
@@ -452,12 +1092,37 @@ class LibraryManager:
         cache_data = self._get_cache_data()
         return not cache_data.get('first_run_completed', False)
     
+    @_flushes_cache
     def mark_first_run_completed(self):
         """Отметить, что первый запуск завершен."""
         cache_data = self._get_cache_data()
         cache_data['first_run_completed'] = True
         self._save_cache_data(cache_data)
     
+    def _append_installed_library(self, lib_name: str):
+        """Добавление одной установленной библиотеки в кэш.
+        
+        Вызывается сразу после успешной установки, чтобы прерванная установка
+        не теряла уже установленные библиотеки. Запись на диск откладывается
+        на полсекунды: несколько библиотек, установленных подряд, сохраняются
+        одной записью. Полная проверка - в save_installed_libraries.
+        
+        Args:
+            lib_name: Имя установленной библиотеки
+        """
+        cache_data = self._get_cache_data()
+        with self._cache_lock:
+            installed = cache_data.setdefault('installed', [])
+            if lib_name in installed:
+                return
+            installed.append(lib_name)
+            self._cache_dirty = True
+            if self._flush_timer is None or not self._flush_timer.is_alive():
+                self._flush_timer = threading.Timer(0.5, self.flush)
+                self._flush_timer.daemon = True
+                self._flush_timer.start()
+    
+    @_flushes_cache
     def save_installed_libraries(self, libraries: List[str]):
         """Сохранение списка установленных библиотек.
         
@@ -468,9 +1133,10 @@ class LibraryManager:
         try:
             import site
             user_site = site.getusersitepackages()
-            if user_site and user_site not in sys.path:
-                sys.path.insert(0, user_site)
-                site.addsitedir(user_site)
+            with self._install_lock:
+                if user_site and user_site not in sys.path:
+                    sys.path.insert(0, user_site)
+                    site.addsitedir(user_site)
         except Exception:
             pass
         
@@ -479,109 +1145,49 @@ class LibraryManager:
         existing_installed = cache_data.get('installed', [])
         logger.debug(f"save_installed_libraries: новые библиотеки={libraries}, существующие={existing_installed}")
         
-        # Объединяем старые и новые установленные библиотеки
-        all_installed = list(set(existing_installed + libraries))
-        logger.debug(f"save_installed_libraries: объединенный список={all_installed}")
-        
         # Проверяем все библиотеки реально и обновляем список
         all_libs_dict = self.get_all_libraries()
-        actually_installed = []
-        
-        # Очищаем кэш импортов для только что установленных библиотек
-        for lib_name in libraries:
-            import_name = (all_libs_dict.get(lib_name) or 
-                         self.REQUIRED_LIBRARIES.get(lib_name) or
-                         self.OPTIONAL_LIBRARIES.get(lib_name) or
-                         (self.WINDOWS_OPTIONAL_LIBRARIES.get(lib_name) if sys.platform == 'win32' else None))
-            if import_name:
-                # Очищаем кэш импортов для этой библиотеки
-                modules_to_remove = [m for m in list(sys.modules.keys()) if m.startswith(import_name)]
-                for m in modules_to_remove:
-                    try:
-                        del sys.modules[m]
-                    except KeyError:
-                        pass
-        
-        # Небольшая задержка для обновления путей Python
-        time.sleep(0.1)
-        
-        # Проверяем все библиотеки из объединенного списка
-        for lib_name in all_installed:
-            import_name = (all_libs_dict.get(lib_name) or 
-                         self.REQUIRED_LIBRARIES.get(lib_name) or
-                         self.OPTIONAL_LIBRARIES.get(lib_name) or
-                         (self.WINDOWS_OPTIONAL_LIBRARIES.get(lib_name) if sys.platform == 'win32' else None))
-            if import_name and self._check_library(lib_name, import_name):
-                actually_installed.append(lib_name)
-        
-        # Также проверяем все остальные библиотеки, которые могут быть установлены
-        for lib_name, import_name in self.REQUIRED_LIBRARIES.items():
-            if lib_name not in actually_installed and self._check_library(lib_name, import_name):
-                actually_installed.append(lib_name)
-        
-        for lib_name, import_name in self.OPTIONAL_LIBRARIES.items():
-            if lib_name not in actually_installed and self._check_library(lib_name, import_name):
-                actually_installed.append(lib_name)
-        
-        if sys.platform == 'win32':
-            for lib_name, import_name in self.WINDOWS_OPTIONAL_LIBRARIES.items():
-                if lib_name not in actually_installed and self._check_library(lib_name, import_name):
-                    actually_installed.append(lib_name)
-        
-        # Сохраняем проверенный список установленных библиотек
-        cache_data['installed'] = actually_installed
         
-        # Инвалидируем кэш проверки, так как библиотеки изменились
-        if 'last_check' in cache_data:
-            del cache_data['last_check']
-        if 'library_status' in cache_data:
-            del cache_data['library_status']
-        
-        # Обновляем статус библиотек в кэше
-        missing_required = []
-        missing_optional = []
-        
-        # Проверяем обязательные библиотеки
-        for lib_name, import_name in self.REQUIRED_LIBRARIES.items():
-            if lib_name not in actually_installed:
-                if not self._check_library(lib_name, import_name):
-                    missing_required.append(lib_name)
-        
-        # Проверяем опциональные библиотеки
-        for lib_name, import_name in self.OPTIONAL_LIBRARIES.items():
-            if lib_name not in actually_installed:
-                if not self._check_library(lib_name, import_name):
-                    missing_optional.append(lib_name)
+        # Библиотеки только что установлены - сбрасываем кэши импорта и
+        # запомненные результаты проверки
+        with self._install_lock:
+            _forget_installed_modules(
+                [all_libs_dict[lib_name] for lib_name in libraries if lib_name in all_libs_dict]
+            )
         
-        # Проверяем Windows-специфичные библиотеки
-        if sys.platform == 'win32':
-            for lib_name, import_name in self.WINDOWS_OPTIONAL_LIBRARIES.items():
-                if lib_name not in actually_installed:
-                    if not self._check_library(lib_name, import_name):
-                        missing_optional.append(lib_name)
+        # Каждая библиотека проверяется ровно один раз: найденные попадают в
+        # список установленных, остальные - в отсутствующие
+        actually_installed = [
+            lib_name for lib_name, import_name in all_libs_dict.items()
+            if self._check_library(lib_name, import_name)
+        ]
+        missing = all_libs_dict.keys() - set(actually_installed)
         
-        # Сохраняем актуальный статус в кэш
+        # Сохраняем проверенный список установленных библиотек и актуальный
+        # статус (кэш проверки заменяется целиком, так как библиотеки изменились)
+        cache_data['installed'] = actually_installed
+        checked_at = datetime.now().isoformat()
         cache_data['library_status'] = {
-            'missing_required': missing_required,
-            'missing_optional': missing_optional
+            lib_name: self._make_status_entry(lib_name not in missing, checked_at)
+            for lib_name in all_libs_dict
         }
-        cache_data['last_check'] = datetime.now().isoformat()
+        cache_data['last_check'] = checked_at
+        cache_data['verified_at'] = checked_at
         
         self._save_cache_data(cache_data)
         logger.info(f"Сохранен список установленных библиотек: {len(actually_installed)} библиотек: {actually_installed}")
     
+    @_flushes_cache
     def invalidate_cache(self):
         """Инвалидация кэша проверки библиотек."""
+        _probe.cache_clear()
         cache_data = self._get_cache_data()
-        if 'last_check' in cache_data:
-            del cache_data['last_check']
-        if 'library_status' in cache_data:
-            del cache_data['library_status']
+        _invalidate_status(cache_data)
         # Очищаем список установленных библиотек, чтобы принудительно проверить все заново
-        if 'installed' in cache_data:
-            del cache_data['installed']
+        cache_data.pop('installed', None)
         self._save_cache_data(cache_data)
     
+    @_flushes_cache
     def uninstall_library(self, lib_name: str) -> Tuple[bool, str]:
         """Удаление библиотеки.
         
@@ -593,16 +1199,18 @@ class LibraryManager:
         """
         try:
             # Валидация имени библиотеки для безопасности
-            if not re.match(r'^[a-zA-Z0-9_-]+$', lib_name):
+            if not _is_valid_lib_name(lib_name):
                 return False, "Недопустимое имя библиотеки"
             
             logger.info(f"Удаление библиотеки {lib_name}...")
-            result = subprocess.run(
-                [sys.executable, "-m", "pip", "uninstall", lib_name, "-y", "--no-warn-script-location"],
-                capture_output=True,
-                text=True,
-                timeout=120
-            )
+            with self._install_file_lock():
+                result = subprocess.run(
+                    [sys.executable, "-m", "pip", "uninstall", lib_name, "-y", *_PIP_COMMON_FLAGS],
+                    capture_output=True,
+                    env=_get_pip_env(),
+                    text=True,
+                    timeout=120
+                )
             
             if result.returncode == 0:
                 logger.info(f"{lib_name} успешно удалена")
@@ -620,6 +1228,7 @@ class LibraryManager:
             logger.error(f"Ошибка при удалении {lib_name}: {e}")
             return False, f"Ошибка: {str(e)}"
     
+    @_flushes_cache
     def install_single_library(self, lib_name: str, install_window: Optional[tk.Toplevel] = None) -> Tuple[bool, str]:
         """Установка одной библиотеки.
         
@@ -632,60 +1241,60 @@ class LibraryManager:
         """
         try:
             # Валидация имени библиотеки для безопасности
-            if not re.match(r'^[a-zA-Z0-9_-]+$', lib_name):
+            if not _is_valid_lib_name(lib_name):
                 return False, "Недопустимое имя библиотеки"
             
+            # Момент начала установки: по нему выбираются пакеты для компиляции
+            install_started = time.time()
+            
             # Специальная обработка для pdf2docx
             numpy_installed = False
             pymupdf_installed = False
             if lib_name == 'pdf2docx':
                 # Проверяем и устанавливаем numpy
-                try:
-                    import numpy  # type: ignore
+                if _is_module_available('numpy'):
                     numpy_installed = True
                     logger.debug("numpy уже установлен")
-                except ImportError:
+                else:
                     # Устанавливаем numpy сначала, используя только предкомпилированные пакеты
                     logger.info("Установка numpy (зависимость для pdf2docx)...")
                     numpy_cmd = self._get_pip_install_args('numpy')
                     # Добавляем --only-binary :all: чтобы использовать только wheels
                     numpy_cmd.insert(-1, '--only-binary')
                     numpy_cmd.insert(-1, ':all:')
-                    numpy_result = subprocess.run(
-                        numpy_cmd,
-                        capture_output=True,
-                        text=True,
-                        timeout=300
-                    )
+                    with self._install_file_lock():
+                        numpy_result = subprocess.run(
+                            numpy_cmd,
+                            capture_output=True,
+                            env=_get_pip_env(),
+                            text=True,
+                            timeout=300
+                        )
                     if numpy_result.returncode != 0:
                         numpy_error = numpy_result.stderr if numpy_result.stderr else numpy_result.stdout or "Неизвестная ошибка"
                         logger.error(f"Не удалось установить numpy: {numpy_error[:500]}")
                         # Извлекаем ключевые части ошибки
-                        error_lines = numpy_error.split('\n')
-                        key_errors = []
-                        for line in error_lines:
-                            line_lower = line.lower()
-                            if any(keyword in line_lower for keyword in ['error', 'failed', 'не удалось', 'ошибка', 'exception', 'requirement', 'could not', 'no matching', 'building wheel', 'failed building', 'cmake', 'visual studio', 'compiler']):
-                                key_errors.append(line.strip())
-                        detailed_error = '\n'.join(key_errors[:5]) if key_errors else numpy_error[:400]
+                        key_errors = _extract_key_errors(numpy_error, 5)
+                        detailed_error = '\n'.join(key_errors) if key_errors else numpy_error[:400]
                         return False, f"Не удалось установить зависимость numpy:\n{detailed_error}\n\nПопробуйте установить вручную:\npip install --user numpy\n\nЕсли ошибка связана с компиляцией, используйте предварительно скомпилированные пакеты или установите Visual Studio Build Tools."
                     numpy_installed = True
                 
                 # Проверяем и устанавливаем PyMuPDF (требуется для pdf2docx)
-                try:
-                    import fitz  # type: ignore
+                if _is_module_available('fitz'):
                     pymupdf_installed = True
                     logger.debug("PyMuPDF (fitz) уже установлен")
-                except ImportError:
+                else:
                     # Устанавливаем PyMuPDF
                     logger.info("Установка PyMuPDF (зависимость для pdf2docx)...")
                     pymupdf_cmd = self._get_pip_install_args('PyMuPDF')
-                    pymupdf_result = subprocess.run(
-                        pymupdf_cmd,
-                        capture_output=True,
-                        text=True,
-                        timeout=300
-                    )
+                    with self._install_file_lock():
+                        pymupdf_result = subprocess.run(
+                            pymupdf_cmd,
+                            capture_output=True,
+                            env=_get_pip_env(),
+                            text=True,
+                            timeout=300
+                        )
                     if pymupdf_result.returncode != 0:
                         pymupdf_error = pymupdf_result.stderr if pymupdf_result.stderr else pymupdf_result.stdout or "Неизвестная ошибка"
                         logger.warning(f"Не удалось установить PyMuPDF: {pymupdf_error[:500]}")
@@ -715,17 +1324,15 @@ class LibraryManager:
             
             timeout_value = 900 if lib_name == 'pdf2docx' else (600 if lib_name in ('moviepy', 'pydub') else 300)
             
-            result = subprocess.run(
-                install_cmd,
-                capture_output=True,
-                text=True,
-                timeout=timeout_value
-            )
+            # Вывод pip читается построчно: в памяти остаются только последние
+            # строки для диагностики, а ход установки сразу попадает в лог
+            with self._install_file_lock():
+                returncode, output = self._run_pip_stream(install_cmd, timeout_value, _log_pip_progress)
             
             # Специальная обработка для pdf2docx - если установка не удалась из-за компиляции,
             # пропускаем её с предупреждением (библиотека не критична)
-            if lib_name == 'pdf2docx' and result.returncode != 0:
-                error_msg = result.stderr if result.stderr else result.stdout or ""
+            if lib_name == 'pdf2docx' and returncode != 0:
+                error_msg = output
                 if 'compiler' in error_msg.lower() or 'building wheel' in error_msg.lower() or 'meson' in error_msg.lower() or 'numpy' in error_msg.lower():
                     logger.warning(f"Не удалось установить {lib_name} из-за проблем с компиляцией зависимостей. "
                                  f"Библиотека не критична для работы программы. "
@@ -733,7 +1340,7 @@ class LibraryManager:
                     return True, f"pdf2docx не установлен (требует компилятор для зависимостей). " \
                                f"Библиотека не критична. Вы можете установить её вручную: pip install pdf2docx"
             
-            if result.returncode == 0:
+            if returncode == 0:
                 logger.info(f"{lib_name} успешно установлена")
                 
                 # Специальная обработка для pywin32 - запускаем post-install скрипт
@@ -744,12 +1351,13 @@ class LibraryManager:
                             sys.prefix, 'Scripts', 'pywin32_postinstall.py'
                         )
                         if os.path.exists(post_install_script):
-                            post_result = subprocess.run(
-                                [sys.executable, post_install_script, '-install'],
-                                capture_output=True,
-                                text=True,
-                                timeout=60
-                            )
+                            with self._install_file_lock():
+                                post_result = subprocess.run(
+                                    [sys.executable, post_install_script, '-install'],
+                                    capture_output=True,
+                                    text=True,
+                                    timeout=60
+                                )
                             if post_result.returncode == 0:
                                 logger.info("pywin32 post-install скрипт выполнен успешно")
                             else:
@@ -759,57 +1367,42 @@ class LibraryManager:
                     except Exception as e:
                         logger.warning(f"Не удалось запустить post-install скрипт для pywin32: {e}")
                 
+                # pip устанавливал без компиляции байткода (--no-compile)
+                self.compile_installed_packages(install_started, 300)
+                
+                import_name = self.get_all_libraries().get(lib_name)
+                
                 # Обновляем sys.path для обнаружения новых модулей
-                try:
-                    import site
-                    import importlib
-                    # Добавляем пользовательский site-packages в sys.path если еще не добавлен
-                    user_site = site.getusersitepackages()
-                    if user_site and user_site not in sys.path:
-                        sys.path.insert(0, user_site)
-                        site.addsitedir(user_site)
+                with self._install_lock:
+                    try:
+                        import site
+                        # Добавляем пользовательский site-packages в sys.path если еще не добавлен
+                        user_site = site.getusersitepackages()
+                        if user_site and user_site not in sys.path:
+                            sys.path.insert(0, user_site)
+                            site.addsitedir(user_site)
+                    except Exception as path_e:
+                        logger.debug(f"Не удалось обновить sys.path после установки {lib_name}: {path_e}")
                     
-                    # Очищаем кэш модулей для установленной библиотеки (если она была загружена ранее)
-                    all_libs = self.get_all_libraries()
-                    import_name = all_libs.get(lib_name)
-                    if import_name:
-                        # Очищаем все модули, начинающиеся с имени импорта
-                        modules_to_remove = [m for m in sys.modules.keys() if m.startswith(import_name)]
-                        for m in modules_to_remove:
-                            del sys.modules[m]
-                except Exception as path_e:
-                    logger.debug(f"Не удалось обновить sys.path после установки {lib_name}: {path_e}")
+                    # Инвалидируем кэш после установки
+                    self.invalidate_cache()
                 
-                # Инвалидируем кэш после установки
-                self.invalidate_cache()
-                
-                # Проверяем, что библиотека действительно доступна
-                all_libs = self.get_all_libraries()
-                import_name = all_libs.get(lib_name)
+                # Проверяем, что библиотека действительно доступна: сбрасываем
+                # кэши импорта и ждем появления модуля вместо фиксированной паузы
                 if import_name:
-                    # Даем немного времени на завершение установки
-                    import time
-                    time.sleep(0.5)
-                    
-                    # Пробуем импортировать библиотеку для проверки
-                    if not self._check_library(lib_name, import_name):
+                    if not self._activate_installed_module(lib_name):
                         return True, f"Библиотека {lib_name} установлена, но может потребоваться перезапуск программы для полной загрузки"
                 
                 return True, f"Библиотека {lib_name} успешно установлена"
             else:
-                error_msg = result.stderr if result.stderr else result.stdout or "Неизвестная ошибка"
+                error_msg = output or "Неизвестная ошибка"
                 logger.warning(f"Не удалось установить {lib_name}: {error_msg[:500]}")
                 
                 # Более детальный анализ ошибки
-                error_lines = error_msg.split('\n')
-                key_errors = []
-                for line in error_lines:
-                    line_lower = line.lower()
-                    if any(keyword in line_lower for keyword in ['error', 'failed', 'не удалось', 'ошибка', 'exception', 'requirement', 'could not', 'no matching', 'building wheel', 'failed building', 'cmake', 'visual studio', 'compiler', 'microsoft visual c++', 'unable to find vcvarsall']):
-                        key_errors.append(line.strip())
+                key_errors = _extract_key_errors(error_msg, 8)
                 
                 if key_errors:
-                    detailed_error = '\n'.join(key_errors[:8])
+                    detailed_error = '\n'.join(key_errors)
                     
                     # Специальные рекомендации для pdf2docx
                     recommendations = ""
@@ -844,6 +1437,68 @@ class LibraryManager:
             logger.error(f"Ошибка при установке {lib_name}: {e}")
             return False, f"Ошибка: {str(e)}"
     
+    @_flushes_cache
+    def install_libraries(self, lib_names: List[str], timeout: Optional[float] = None) -> Tuple[bool, str]:
+        """Установка нескольких библиотек одним вызовом pip.
+        
+        Один процесс pip вместо отдельного на каждую библиотеку: запуск
+        интерпретатора, загрузка индекса и разрешение зависимостей выполняются
+        один раз. Для pdf2docx в тот же вызов добавляется numpy (только из
+        готовых wheel).
+        
+        Args:
+            lib_names: Список библиотек для установки
+            timeout: Максимальное время установки в секундах (по умолчанию
+                зависит от числа крупных библиотек)
+            
+        Returns:
+            Кортеж (успех, сообщение)
+        """
+        try:
+            # Валидация имен библиотек для безопасности
+            invalid = [lib for lib in lib_names if not _is_valid_lib_name(lib)]
+            if invalid or not lib_names:
+                return False, "Недопустимое имя библиотеки"
+            
+            if timeout is None:
+                timeout = 300 + 300 * sum(1 for lib in lib_names if lib in ('moviepy', 'pydub', 'pdf2docx'))
+            
+            # pdf2docx требует numpy: ставим его в том же вызове pip
+            extra_args = []
+            if 'pdf2docx' in lib_names and 'numpy' not in lib_names and not _is_module_available('numpy'):
+                lib_names = ['numpy'] + list(lib_names)
+                extra_args = ['--only-binary', 'numpy']
+            
+            logger.info(f"Установка библиотек одним вызовом pip: {', '.join(lib_names)}")
+            # Список передается файлом требований, а не аргументами: длина
+            # командной строки на Windows ограничена
+            with self._requirements_file(lib_names) as req_path, self._install_file_lock():
+                install_cmd = self._get_pip_install_args('-r', req_path)
+                install_cmd[-1:-1] = ['--quiet', *extra_args]
+                result = subprocess.run(
+                    install_cmd,
+                    capture_output=True,
+                    env=_get_pip_env(),
+                    text=True,
+                    timeout=timeout
+                )
+            
+            if result.returncode == 0:
+                logger.info(f"Библиотеки успешно установлены: {', '.join(lib_names)}")
+                # Инвалидируем кэш после установки
+                self.invalidate_cache()
+                return True, f"Установлено библиотек: {len(lib_names)}"
+            
+            error_msg = result.stderr if result.stderr else result.stdout or f"Код возврата: {result.returncode}"
+            logger.warning(f"Не удалось установить библиотеки одним вызовом: {error_msg[:500]}")
+            return False, f"Ошибка установки: {error_msg[:500]}"
+        except subprocess.TimeoutExpired:
+            logger.error(f"Таймаут при установке библиотек: {', '.join(lib_names)}")
+            return False, "Таймаут при установке библиотек"
+        except Exception as e:
+            logger.error(f"Ошибка при установке библиотек: {e}")
+            return False, f"Ошибка: {str(e)}"
+    
     def is_library_installed(self, lib_name: str) -> bool:
         """Проверка установлена ли библиотека.
         
@@ -859,6 +1514,7 @@ class LibraryManager:
             return False
         return self._check_library(lib_name, import_name)
     
+    @_flushes_cache
     def check_and_install(self, install_optional: bool = True, silent: bool = False, force_check: bool = False):
         """Проверка и автоматическая установка необходимых библиотек.
         
@@ -878,16 +1534,17 @@ class LibraryManager:
             # Сначала проверяем библиотеки, которые были помечены как установленные
             installed_libs = self.get_installed_libraries()
             
-            # Проверяем библиотеки из списка установленных, чтобы убедиться что они действительно установлены
+            # Проверяем библиотеки из списка установленных, чтобы убедиться что они действительно установлены.
+            # Если список уже проверялся недавно, доверяем ему без повторных проверок
             actually_installed = []
-            if installed_libs:
+            if installed_libs and not force_check and self._is_installed_list_verified():
+                logger.debug("Список установленных библиотек проверен недавно, повторная проверка пропущена")
+                actually_installed = list(installed_libs)
+            elif installed_libs:
                 logger.debug(f"Проверка ранее установленных библиотек: {', '.join(installed_libs)}")
                 all_libs_dict = self.get_all_libraries()
                 for lib in installed_libs:
-                    import_name = (all_libs_dict.get(lib) or 
-                                 self.REQUIRED_LIBRARIES.get(lib) or
-                                 self.OPTIONAL_LIBRARIES.get(lib) or
-                                 (self.WINDOWS_OPTIONAL_LIBRARIES.get(lib) if sys.platform == 'win32' else None))
+                    import_name = all_libs_dict.get(lib)
                     if import_name and self._check_library(lib, import_name):
                         actually_installed.append(lib)
                     else:
@@ -897,6 +1554,8 @@ class LibraryManager:
                 if set(actually_installed) != set(installed_libs):
                     logger.info(f"Обновление кэша: найдено {len(actually_installed)} из {len(installed_libs)} библиотек")
                     self.save_installed_libraries(actually_installed)
+                else:
+                    self._mark_installed_list_verified()
             
             # Делаем проверку всех библиотек
             # Используем кэш только если не принудительная проверка и это не первый запуск
@@ -943,11 +1602,7 @@ class LibraryManager:
                 
                 if silent:
                     # В тихом режиме устанавливаем автоматически в фоне
-                    threading.Thread(
-                        target=self._install_libraries_silent,
-                        args=(all_to_install,),
-                        daemon=True
-                    ).start()
+                    self._submit_background(self._install_libraries_silent, all_to_install)
                 else:
                     # Показываем окно установки только при первом запуске
                     self._show_install_window(required_to_install, optional_to_install)
@@ -976,144 +1631,194 @@ class LibraryManager:
         error_count = 0
         
         logger.info(f"Начало автоматической установки {len(libraries)} библиотек...")
+        # Момент начала установки: по нему выбираются пакеты для компиляции
+        install_started = time.time()
         
+        # Библиотеки, которые уже доступны в текущем интерпретаторе, не
+        # передаем в pip, но сохраняем в списке установленных
+        all_libs_dict = self.get_all_libraries()
+        libraries_to_install = []
         for lib in libraries:
-            try:
-                # Валидация имени библиотеки для безопасности
-                if not re.match(r'^[a-zA-Z0-9_-]+$', lib):
-                    logger.warning(f"Недопустимое имя библиотеки: {lib}")
-                    error_count += 1
-                    continue
-                
-                logger.info(f"Установка {lib}...")
-                
-                # Специальная обработка для библиотек с зависимостями
-                # pdf2docx требует numpy и PyMuPDF
-                if lib == 'pdf2docx':
-                    # Устанавливаем numpy
+            import_name = all_libs_dict.get(lib)
+            if import_name and self._check_library(lib, import_name):
+                logger.info(f"✓ {lib} уже установлен")
+                success_count += 1
+                installed_libs.append(lib)
+            else:
+                libraries_to_install.append(lib)
+        
+        # Сначала пробуем установить все библиотеки одним вызовом pip; если он
+        # не удался, устанавливаем по одной, чтобы точно знать, какая из
+        # библиотек вызвала ошибку
+        if len(libraries_to_install) > 1 and all(_is_valid_lib_name(lib) for lib in libraries_to_install):
+            batch_ok, _ = self.install_libraries(libraries_to_install)
+            if batch_ok:
+                for lib in libraries_to_install:
+                    self._append_installed_library(lib)
+                installed_libs.extend(libraries_to_install)
+                success_count += len(libraries_to_install)
+                libraries_to_install = []
+        
+        # Библиотеки устанавливаем по одной (процессы pip не должны писать в
+        # site-packages одновременно). pdf2docx ставится последней, так как
+        # сама доустанавливает свои зависимости
+        ordered_libs = (
+            [lib for lib in libraries_to_install if lib not in _SERIAL_INSTALL_LIBS]
+            + [lib for lib in libraries_to_install if lib in _SERIAL_INSTALL_LIBS]
+        )
+        results = [self._pip_install_one(lib) for lib in ordered_libs]
+        
+        for lib, ok in results:
+            if ok:
+                success_count += 1
+                installed_libs.append(lib)
+            elif ok is not None:
+                error_count += 1
+        
+        # pip устанавливал без компиляции байткода (--no-compile)
+        if installed_libs:
+            self.compile_installed_packages(install_started)
+        
+        # Сохраняем информацию об установленных библиотеках
+        if installed_libs:
+            self.save_installed_libraries(installed_libs)
+        
+        # Финальное сообщение
+        if error_count == 0:
+            logger.info(f"Все библиотеки установлены успешно! ({success_count} библиотек)")
+            logger.info("Некоторые библиотеки могут потребовать перезапуска программы для загрузки.")
+        else:
+            logger.warning(f"Установка завершена: успешно {success_count}, ошибок {error_count}")
+            installed_names = set(installed_libs)
+            failed_libs = [lib for lib in libraries if lib not in installed_names]
+            if failed_libs:
+                logger.warning(f"Неустановленные библиотеки: {', '.join(failed_libs)}")
+                logger.info("Попробуйте установить их вручную или перезапустите программу для повторной попытки.")
+    
+    def _pip_install_one(self, lib: str) -> Tuple[str, Optional[bool]]:
+        """Установка одной библиотеки в фоновом режиме (с зависимостями pdf2docx).
+        
+        Args:
+            lib: Имя библиотеки
+            
+        Returns:
+            Кортеж (имя, результат): True - установлена, False - ошибка,
+            None - пропущена (pdf2docx без готовых wheel зависимостей)
+        """
+        try:
+            # Валидация имени библиотеки для безопасности
+            if not _is_valid_lib_name(lib):
+                logger.warning(f"Недопустимое имя библиотеки: {lib}")
+                return lib, False
+            
+            logger.info(f"Установка {lib}...")
+            
+            # Специальная обработка для библиотек с зависимостями
+            # pdf2docx требует numpy и PyMuPDF
+            if lib == 'pdf2docx':
+                # Устанавливаем numpy
+                if not _is_module_available('numpy'):
                     try:
-                        import numpy  # type: ignore
-                    except ImportError:
-                        try:
-                            logger.info("Установка numpy (зависимость для pdf2docx)...")
+                        logger.info("Установка numpy (зависимость для pdf2docx)...")
+                        with self._install_file_lock():
                             numpy_result = subprocess.run(
                                 self._get_pip_install_args('numpy')[:-1] + ['--quiet', '--no-warn-script-location'],
-                                capture_output=True,
+                                stdout=subprocess.DEVNULL,
+                                stderr=subprocess.PIPE,
+                                env=_get_pip_env(),
                                 text=True,
                                 timeout=300
                             )
-                            if numpy_result.returncode == 0:
-                                logger.info("✓ numpy установлен как зависимость")
-                            else:
-                                logger.warning(f"Не удалось установить numpy: {numpy_result.stderr[:200] if numpy_result.stderr else 'Неизвестная ошибка'}")
-                        except Exception as numpy_e:
-                            logger.warning(f"Ошибка установки numpy: {numpy_e}")
-                    
-                    # Устанавливаем PyMuPDF
+                        if numpy_result.returncode == 0:
+                            logger.info("✓ numpy установлен как зависимость")
+                        else:
+                            logger.warning(f"Не удалось установить numpy: {numpy_result.stderr[:200] if numpy_result.stderr else 'Неизвестная ошибка'}")
+                    except Exception as numpy_e:
+                        logger.warning(f"Ошибка установки numpy: {numpy_e}")
+                
+                # Устанавливаем PyMuPDF
+                if not _is_module_available('fitz'):
                     try:
-                        import fitz  # type: ignore
-                    except ImportError:
-                        try:
-                            logger.info("Установка PyMuPDF (зависимость для pdf2docx)...")
+                        logger.info("Установка PyMuPDF (зависимость для pdf2docx)...")
+                        with self._install_file_lock():
                             pymupdf_result = subprocess.run(
                                 self._get_pip_install_args('PyMuPDF')[:-1] + ['--quiet', '--no-warn-script-location'],
-                                capture_output=True,
+                                stdout=subprocess.DEVNULL,
+                                stderr=subprocess.PIPE,
+                                env=_get_pip_env(),
                                 text=True,
                                 timeout=300
                             )
-                            if pymupdf_result.returncode == 0:
-                                logger.info("✓ PyMuPDF установлен как зависимость")
-                            else:
-                                logger.warning(f"Не удалось установить PyMuPDF: {pymupdf_result.stderr[:200] if pymupdf_result.stderr else 'Неизвестная ошибка'}")
-                        except Exception as pymupdf_e:
-                            logger.warning(f"Ошибка установки PyMuPDF: {pymupdf_e}")
-                
-                # pydub может работать без ffmpeg для некоторых форматов, но лучше установить базовые зависимости
-                # moviepy требует несколько зависимостей, но они обычно устанавливаются автоматически
-                
-                # Установка библиотеки с зависимостями
-                # Используем --no-warn-script-location для уменьшения предупреждений
-                install_cmd = self._get_pip_install_args(lib)
-                install_cmd.insert(-1, '--quiet')  # Добавляем --quiet перед --no-warn-script-location
-                
-                # Специальная обработка для pdf2docx
-                if lib == 'pdf2docx':
-                    install_cmd.insert(-1, '--only-binary')
-                    install_cmd.insert(-1, ':all:')
-                    try:
-                        import numpy  # type: ignore
-                        install_cmd.insert(-1, '--no-deps')
-                    except ImportError:
-                        pass
-                
-                # Для некоторых библиотек добавляем дополнительные опции
-                if lib in ('moviepy', 'pydub'):
-                    # Увеличиваем таймаут для больших библиотек
-                    timeout = 600
-                elif lib == 'pdf2docx':
-                    timeout = 900
-                else:
-                    timeout = 300
-                
+                        if pymupdf_result.returncode == 0:
+                            logger.info("✓ PyMuPDF установлен как зависимость")
+                        else:
+                            logger.warning(f"Не удалось установить PyMuPDF: {pymupdf_result.stderr[:200] if pymupdf_result.stderr else 'Неизвестная ошибка'}")
+                    except Exception as pymupdf_e:
+                        logger.warning(f"Ошибка установки PyMuPDF: {pymupdf_e}")
+            
+            # pydub может работать без ffmpeg для некоторых форматов, но лучше установить базовые зависимости
+            # moviepy требует несколько зависимостей, но они обычно устанавливаются автоматически
+            
+            # Установка библиотеки с зависимостями
+            # Используем --no-warn-script-location для уменьшения предупреждений
+            install_cmd = self._get_pip_install_args(lib)
+            install_cmd.insert(-1, '--quiet')  # Добавляем --quiet перед --no-warn-script-location
+            
+            # Специальная обработка для pdf2docx
+            if lib == 'pdf2docx':
+                install_cmd.insert(-1, '--only-binary')
+                install_cmd.insert(-1, ':all:')
+                if _is_module_available('numpy'):
+                    install_cmd.insert(-1, '--no-deps')
+            
+            # Для некоторых библиотек добавляем дополнительные опции
+            if lib in ('moviepy', 'pydub'):
+                # Увеличиваем таймаут для больших библиотек
+                timeout = 600
+            elif lib == 'pdf2docx':
+                timeout = 900
+            else:
+                timeout = 300
+            
+            with self._install_file_lock():
                 result = subprocess.run(
                     install_cmd,
-                    capture_output=True,
+                    # С --quiet pip почти ничего не пишет в stdout, нужен только stderr
+                    stdout=subprocess.DEVNULL,
+                    stderr=subprocess.PIPE,
+                    env=_get_pip_env(),
                     text=True,
                     timeout=timeout
                 )
+            
+            # Специальная обработка для pdf2docx - если установка не удалась из-за компиляции,
+            # пропускаем её с предупреждением (библиотека не критична)
+            if lib == 'pdf2docx' and result.returncode != 0:
+                error_msg = result.stderr or ""
+                if 'compiler' in error_msg.lower() or 'building wheel' in error_msg.lower() or 'meson' in error_msg.lower() or 'numpy' in error_msg.lower():
+                    logger.warning(f"Не удалось установить {lib} из-за проблем с компиляцией зависимостей. "
+                                 f"Библиотека не критична для работы программы. Пропускаем установку.")
+                    # Не считаем это ошибкой, просто пропускаем
+                    return lib, None
+            
+            if result.returncode == 0:
+                logger.info(f"✓ {lib} установлен успешно")
+                self._append_installed_library(lib)
                 
-                # Специальная обработка для pdf2docx - если установка не удалась из-за компиляции,
-                # пропускаем её с предупреждением (библиотека не критична)
-                if lib == 'pdf2docx' and result.returncode != 0:
-                    error_msg = result.stderr if result.stderr else result.stdout or ""
-                    if 'compiler' in error_msg.lower() or 'building wheel' in error_msg.lower() or 'meson' in error_msg.lower() or 'numpy' in error_msg.lower():
-                        logger.warning(f"Не удалось установить {lib} из-за проблем с компиляцией зависимостей. "
-                                     f"Библиотека не критична для работы программы. Пропускаем установку.")
-                        # Не считаем это ошибкой, просто пропускаем
-                        continue
-                
-                if result.returncode == 0:
-                    logger.info(f"✓ {lib} установлен успешно")
-                    success_count += 1
-                    installed_libs.append(lib)
-                    
-                    # Пробуем перезагрузить модуль для некоторых библиотек, чтобы они были доступны сразу
-                    # (для некоторых библиотек может потребоваться перезапуск Python)
-                    try:
-                        if lib == 'pydub':
-                            import importlib
-                            importlib.reload(sys.modules.get('pydub', None))
-                        elif lib == 'moviepy':
-                            import importlib
-                            importlib.reload(sys.modules.get('moviepy', None))
-                    except Exception:
-                        pass  # Не критично, библиотека все равно будет доступна после перезапуска
-                else:
-                    error_msg = result.stderr if result.stderr else result.stdout or f"Код возврата: {result.returncode}"
-                    logger.error(f"✗ Ошибка установки {lib}: {error_msg[:500]}")
-                    error_count += 1
-                    
-            except subprocess.TimeoutExpired:
-                logger.error(f"✗ Таймаут при установке {lib}")
-                error_count += 1
-            except Exception as e:
-                logger.error(f"✗ Ошибка {lib}: {e}")
-                error_count += 1
-        
-        # Сохраняем информацию об установленных библиотеках
-        if installed_libs:
-            self.save_installed_libraries(installed_libs)
-        
-        # Финальное сообщение
-        if error_count == 0:
-            logger.info(f"Все библиотеки установлены успешно! ({success_count} библиотек)")
-            logger.info("Некоторые библиотеки могут потребовать перезапуска программы для загрузки.")
-        else:
-            logger.warning(f"Установка завершена: успешно {success_count}, ошибок {error_count}")
-            failed_libs = [lib for lib in libraries if lib not in installed_libs]
-            if failed_libs:
-                logger.warning(f"Неустановленные библиотеки: {', '.join(failed_libs)}")
-                logger.info("Попробуйте установить их вручную или перезапустите программу для повторной попытки.")
+                # Делаем библиотеку доступной без перезапуска программы
+                # (для некоторых библиотек перезапуск все же может потребоваться)
+                self._activate_installed_module(lib)
+                return lib, True
+            
+            error_msg = result.stderr or f"Код возврата: {result.returncode}"
+            logger.error(f"✗ Ошибка установки {lib}: {error_msg[:500]}")
+            return lib, False
+        except subprocess.TimeoutExpired:
+            logger.error(f"✗ Таймаут при установке {lib}")
+            return lib, False
+        except Exception as e:
+            logger.error(f"✗ Ошибка {lib}: {e}")
+            return lib, False
     
     def _show_status_window(self, required_libs: List[str], optional_libs: List[str], status_message: str = ""):
         """Показ окна статуса библиотек (без установки).
@@ -1158,8 +1863,7 @@ class LibraryManager:
             status_label.pack()
         
         # Список библиотек
-        installed_libs = self.get_installed_libraries()
-        all_libs_dict = self.get_all_libraries()
+        installed_libs = set(self.get_installed_libraries())
         
         text_frame = tk.Frame(status_window)
         text_frame.pack(fill=tk.BOTH, expand=True, padx=20, pady=10)
@@ -1177,33 +1881,28 @@ class LibraryManager:
         status_text.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         scrollbar.config(command=status_text.yview)
         
-        status_text.insert(tk.END, "Обязательные библиотеки:\n")
-        for lib in self.REQUIRED_LIBRARIES:
-            status = "✓ установлена" if lib in installed_libs else "✗ отсутствует"
-            color = "green" if lib in installed_libs else "red"
-            status_text.insert(tk.END, f"  {lib}: {status}\n")
-            last_line = status_text.index(tk.END + "-1l")
-            status_text.tag_add(lib, last_line.split('.')[0] + ".0", tk.END + "-1c")
-            status_text.tag_config(lib, foreground=color)
-        
-        status_text.insert(tk.END, "\nОпциональные библиотеки:\n")
-        for lib in self.OPTIONAL_LIBRARIES:
-            status = "✓ установлена" if lib in installed_libs else "○ не установлена"
-            color = "green" if lib in installed_libs else "gray"
-            status_text.insert(tk.END, f"  {lib}: {status}\n")
-            last_line = status_text.index(tk.END + "-1l")
-            status_text.tag_add(lib, last_line.split('.')[0] + ".0", tk.END + "-1c")
-            status_text.tag_config(lib, foreground=color)
-        
+        # Весь текст вставляется одним вызовом insert: каждая строка библиотеки
+        # передается вместе с тегом цвета, без запросов index() к Tk
+        sections = [
+            ("Обязательные библиотеки:\n", self.REQUIRED_LIBRARIES, "✗ отсутствует", 'missing'),
+            ("\nОпциональные библиотеки:\n", self.OPTIONAL_LIBRARIES, "○ не установлена", 'absent'),
+        ]
         if sys.platform == 'win32':
-            status_text.insert(tk.END, "\nWindows-специфичные библиотеки:\n")
-            for lib in self.WINDOWS_OPTIONAL_LIBRARIES:
-                status = "✓ установлена" if lib in installed_libs else "○ не установлена"
-                color = "green" if lib in installed_libs else "gray"
-                status_text.insert(tk.END, f"  {lib}: {status}\n")
-                last_line = status_text.index(tk.END + "-1l")
-                status_text.tag_add(lib, last_line.split('.')[0] + ".0", tk.END + "-1c")
-                status_text.tag_config(lib, foreground=color)
+            sections.append(
+                ("\nWindows-специфичные библиотеки:\n", self.WINDOWS_OPTIONAL_LIBRARIES, "○ не установлена", 'absent')
+            )
+        chunks = []
+        for header, libs, missing_status, missing_tag in sections:
+            chunks.extend((header, ()))
+            for lib in libs:
+                if lib in installed_libs:
+                    chunks.extend((f"  {lib}: ✓ установлена\n", ('installed',)))
+                else:
+                    chunks.extend((f"  {lib}: {missing_status}\n", (missing_tag,)))
+        status_text.insert(tk.END, *chunks)
+        status_text.tag_config('installed', foreground='green')
+        status_text.tag_config('missing', foreground='red')
+        status_text.tag_config('absent', foreground='gray')
         
         status_text.config(state=tk.DISABLED)
         
@@ -1256,16 +1955,17 @@ class LibraryManager:
         )
         info_label.pack(pady=20)
         
-        install_window.update()
-        
         self.install_libraries_auto(all_libs, install_window)
     
-    def install_libraries_auto(self, libraries: List[str], parent_window: tk.Toplevel):
+    def install_libraries_auto(self, libraries: List[str], parent_window: tk.Toplevel,
+                               overall_timeout: float = 1200):
         """Автоматическая установка библиотек.
         
         Args:
             libraries: Список библиотек для установки
             parent_window: Родительское окно
+            overall_timeout: Общее время на установку всех библиотек в секундах;
+                после него оставшиеся библиотеки пропускаются
         """
         progress_window = tk.Toplevel(parent_window)
         progress_window.title("Установка библиотек")
@@ -1306,354 +2006,19 @@ class LibraryManager:
         )
         progress_text.pack(fill=tk.BOTH, expand=True, padx=15, pady=10)
         
+        # Индикатор показывает число обработанных библиотек
         progress_bar = ttk.Progressbar(
             progress_window,
-            mode='indeterminate',
-            length=550
+            mode='determinate',
+            length=550,
+            maximum=max(len(libraries), 1)
         )
         progress_bar.pack(pady=10)
-        progress_bar.start()
-        
-        installed_libs = []
-        
-        def install_thread():
-            """Установка библиотек в отдельном потоке."""
-            nonlocal installed_libs
-            success_count = 0
-            error_count = 0
-            
-            total_libs = len(libraries)
-            self.root.after(0, lambda t=total_libs: counter_label.config(text=f"Библиотек для установки: {t}"))
-            
-            # Проверяем доступность pip
-            try:
-                self.root.after(0, lambda: progress_text.insert(tk.END, "🔍 Проверка доступности pip...\n"))
-                self.root.after(0, lambda: progress_text.see(tk.END))
-                self.root.after(0, lambda: progress_window.update())
-                check_pip = subprocess.run(
-                    [sys.executable, '-m', 'pip', '--version'],
-                    capture_output=True,
-                    text=True,
-                    timeout=10
-                )
-                if check_pip.returncode != 0:
-                    self.root.after(0, lambda: progress_text.insert(tk.END, "✗ pip не доступен. Установите pip вручную.\n"))
-                    self.root.after(0, lambda: progress_bar.stop())
-                    self.root.after(0, lambda: close_btn.config(state=tk.NORMAL))
-                    return
-                else:
-                    pip_version = check_pip.stdout.strip() if check_pip.stdout else "доступен"
-                    self.root.after(0, lambda v=pip_version: progress_text.insert(tk.END, f"✓ pip {v}\n"))
-                    self.root.after(0, lambda: progress_text.see(tk.END))
-            except Exception as e:
-                self.root.after(0, lambda: progress_text.insert(tk.END, f"✗ Ошибка проверки pip: {str(e)}\n"))
-                self.root.after(0, lambda: progress_bar.stop())
-                self.root.after(0, lambda: close_btn.config(state=tk.NORMAL))
-                return
-            
-            for idx, lib in enumerate(libraries, 1):
-                try:
-                    # Валидация имени библиотеки для безопасности
-                    if not re.match(r'^[a-zA-Z0-9_-]+$', lib):
-                        error_msg = f"Недопустимое имя библиотеки: {lib}"
-                        self.root.after(0, lambda l=lib, e=error_msg: progress_text.insert(tk.END, f"✗ Ошибка валидации {l}: {e}\n"))
-                        error_count += 1
-                        continue
-                    
-                    current_num = idx
-                    self.root.after(0, lambda l=lib, n=current_num, t=total_libs: status_label.config(
-                        text=f"Установка {l}... ({n}/{t})"
-                    ))
-                    self.root.after(0, lambda l=lib, n=current_num, t=total_libs: counter_label.config(
-                        text=f"Установка: {n} из {t}"
-                    ))
-                    self.root.after(0, lambda l=lib, n=current_num, t=total_libs: progress_text.insert(tk.END, f"\n[{n}/{t}] Установка {l}...\n"))
-                    self.root.after(0, lambda: progress_text.see(tk.END))
-                    self.root.after(0, lambda: progress_window.update())
-                    
-                    # Специальная обработка для библиотек, которые могут требовать дополнительные зависимости
-                    install_cmd = self._get_pip_install_args(lib)
-                    
-                    # Для pdf2docx может потребоваться numpy, устанавливаем его заранее
-                    numpy_installed = False
-                    if lib == 'pdf2docx':
-                        self.root.after(0, lambda: progress_text.insert(tk.END, f"Проверка зависимостей для {lib}...\n"))
-                        self.root.after(0, lambda: progress_text.see(tk.END))
-                        self.root.after(0, lambda: progress_window.update())
-                        
-                        # Пробуем установить numpy если его нет
-                        try:
-                            import numpy  # type: ignore
-                            numpy_installed = True
-                        except ImportError:
-                            try:
-                                self.root.after(0, lambda: progress_text.insert(tk.END, f"Установка numpy (зависимость для pdf2docx)...\n"))
-                                self.root.after(0, lambda: progress_text.see(tk.END))
-                                self.root.after(0, lambda: progress_window.update())
-                                
-                                # Используем --only-binary для numpy чтобы избежать компиляции
-                                numpy_cmd = self._get_pip_install_args('numpy')
-                                numpy_cmd.insert(-1, '--only-binary')
-                                numpy_cmd.insert(-1, ':all:')
-                                numpy_result = subprocess.run(
-                                    numpy_cmd,
-                                    capture_output=True,
-                                    text=True,
-                                    timeout=300
-                                )
-                                if numpy_result.returncode == 0:
-                                    self.root.after(0, lambda: progress_text.insert(tk.END, f"✓ numpy установлен как зависимость\n"))
-                                    numpy_installed = True
-                                else:
-                                    numpy_error = numpy_result.stderr if numpy_result.stderr else numpy_result.stdout or "Неизвестная ошибка"
-                                    # Извлекаем ключевые ошибки
-                                    error_lines = numpy_error.split('\n')
-                                    key_errors = [line.strip() for line in error_lines if any(kw in line.lower() for kw in ['error', 'failed', 'ошибка', 'exception', 'requirement', 'could not', 'building wheel'])]
-                                    error_summary = '\n'.join(key_errors[:3]) if key_errors else numpy_error[:300]
-                                    self.root.after(0, lambda e=error_summary: progress_text.insert(tk.END, f"⚠ Предупреждение: не удалось установить numpy:\n{e[:400]}\n"))
-                            except Exception as numpy_e:
-                                self.root.after(0, lambda err=str(numpy_e)[:100]: progress_text.insert(tk.END, f"⚠ Предупреждение: ошибка установки numpy: {err}\n"))
-                        
-                        # Пробуем установить PyMuPDF если его нет
-                        pymupdf_installed = False
-                        try:
-                            import fitz  # type: ignore
-                            pymupdf_installed = True
-                        except ImportError:
-                            try:
-                                self.root.after(0, lambda: progress_text.insert(tk.END, f"Установка PyMuPDF (зависимость для pdf2docx)...\n"))
-                                self.root.after(0, lambda: progress_text.see(tk.END))
-                                self.root.after(0, lambda: progress_window.update())
-                                
-                                pymupdf_cmd = self._get_pip_install_args('PyMuPDF')
-                                pymupdf_result = subprocess.run(
-                                    pymupdf_cmd,
-                                    capture_output=True,
-                                    text=True,
-                                    timeout=300
-                                )
-                                if pymupdf_result.returncode == 0:
-                                    self.root.after(0, lambda: progress_text.insert(tk.END, f"✓ PyMuPDF установлен как зависимость\n"))
-                                    pymupdf_installed = True
-                                else:
-                                    pymupdf_error = pymupdf_result.stderr if pymupdf_result.stderr else pymupdf_result.stdout or "Неизвестная ошибка"
-                                    self.root.after(0, lambda e=pymupdf_error[:300]: progress_text.insert(tk.END, f"⚠ Предупреждение: не удалось установить PyMuPDF:\n{e[:400]}\n"))
-                            except Exception as pymupdf_e:
-                                self.root.after(0, lambda err=str(pymupdf_e)[:100]: progress_text.insert(tk.END, f"⚠ Предупреждение: ошибка установки PyMuPDF: {err}\n"))
-                    
-                    # Для pdf2docx: всегда используем --only-binary :all: чтобы использовать только wheels
-                    if lib == 'pdf2docx':
-                        install_cmd.insert(-1, '--only-binary')
-                        install_cmd.insert(-1, ':all:')
-                        if numpy_installed:
-                            # Если numpy уже установлен, также используем --no-deps
-                            install_cmd.insert(-1, '--no-deps')
-                            self.root.after(0, lambda: progress_text.insert(tk.END, f"Установка pdf2docx только из wheels без зависимостей (numpy уже установлен)...\n"))
-                        else:
-                            self.root.after(0, lambda: progress_text.insert(tk.END, f"Установка pdf2docx только из wheels...\n"))
-                        install_cmd.extend(['--no-cache-dir'])
-                    
-                    # Увеличиваем таймаут для тяжелых библиотек
-                    timeout_value = 600 if lib in ('pdf2docx', 'moviepy', 'pydub') else 300
-                    
-                    result = subprocess.run(
-                        install_cmd,
-                        capture_output=True,
-                        text=True,
-                        timeout=timeout_value
-                    )
-                    
-                    # Специальная обработка для pdf2docx - если установка не удалась из-за компиляции,
-                    # пропускаем её с предупреждением (библиотека не критична)
-                    if lib == 'pdf2docx' and result.returncode != 0:
-                        error_msg = result.stderr if result.stderr else result.stdout or ""
-                        if 'compiler' in error_msg.lower() or 'building wheel' in error_msg.lower() or 'meson' in error_msg.lower() or 'numpy' in error_msg.lower():
-                            self.root.after(0, lambda: progress_text.insert(tk.END, f"  ⚠ pdf2docx не установлен (требует компилятор). Библиотека не критична.\n"))
-                            self.root.after(0, lambda: progress_text.insert(tk.END, f"  Вы можете установить её вручную позже: pip install pdf2docx\n"))
-                            self.root.after(0, lambda: progress_text.see(tk.END))
-                            # Не считаем это ошибкой, просто пропускаем
-                            continue
-                    
-                    if result.returncode == 0:
-                        # Обновляем sys.path для обнаружения новых модулей
-                        try:
-                            import site
-                            user_site = site.getusersitepackages()
-                            if user_site and user_site not in sys.path:
-                                sys.path.insert(0, user_site)
-                                site.addsitedir(user_site)
-                            
-                            # Очищаем кэш модулей
-                            all_libs_dict = self.get_all_libraries()
-                            import_name = all_libs_dict.get(lib)
-                            if import_name:
-                                modules_to_remove = [m for m in sys.modules.keys() if m.startswith(import_name)]
-                                for m in modules_to_remove:
-                                    del sys.modules[m]
-                        except Exception:
-                            pass
-                        
-                        # Специальная обработка для pywin32 - запускаем post-install скрипт
-                        if lib == 'pywin32':
-                            try:
-                                self.root.after(0, lambda: progress_text.insert(tk.END, f"  Запуск post-install скрипта для {lib}...\n"))
-                                self.root.after(0, lambda: progress_text.see(tk.END))
-                                self.root.after(0, lambda: progress_window.update())
-                                
-                                post_install_script = os.path.join(
-                                    sys.prefix, 'Scripts', 'pywin32_postinstall.py'
-                                )
-                                if os.path.exists(post_install_script):
-                                    post_result = subprocess.run(
-                                        [sys.executable, post_install_script, '-install'],
-                                        capture_output=True,
-                                        text=True,
-                                        timeout=60
-                                    )
-                                    if post_result.returncode == 0:
-                                        self.root.after(0, lambda: progress_text.insert(tk.END, f"  ✓ pywin32 post-install выполнен\n"))
-                                    else:
-                                        self.root.after(0, lambda: progress_text.insert(tk.END, f"  ⚠ pywin32 post-install завершился с предупреждением\n"))
-                                else:
-                                    self.root.after(0, lambda: progress_text.insert(tk.END, f"  ⚠ pywin32_postinstall.py не найден\n"))
-                            except Exception as e:
-                                self.root.after(0, lambda err=str(e)[:100]: progress_text.insert(tk.END, f"  ⚠ Ошибка post-install для pywin32: {err}\n"))
-                        
-                        # Проверяем, что библиотека действительно установлена
-                        all_libs_dict = self.get_all_libraries()
-                        import_name = all_libs_dict.get(lib)
-                        if import_name:
-                            # Даем немного времени на завершение установки
-                            time.sleep(0.2)
-                            # Проверяем библиотеку
-                            if self._check_library(lib, import_name):
-                                self.root.after(0, lambda l=lib: progress_text.insert(tk.END, f"  ✓ {l} установлен успешно\n"))
-                                success_count += 1
-                                installed_libs.append(lib)
-                            else:
-                                # Библиотека установлена, но не может быть импортирована сразу
-                                # Это нормально для некоторых библиотек, требующих перезапуска
-                                self.root.after(0, lambda l=lib: progress_text.insert(tk.END, f"  ✓ {l} установлен (может потребоваться перезапуск)\n"))
-                                success_count += 1
-                                installed_libs.append(lib)
-                        else:
-                            self.root.after(0, lambda l=lib: progress_text.insert(tk.END, f"  ✓ {l} установлен успешно\n"))
-                            success_count += 1
-                            installed_libs.append(lib)
-                        self.root.after(0, lambda s=success_count, t=total_libs: counter_label.config(
-                            text=f"Успешно установлено: {s} из {t}"
-                        ))
-                    else:
-                        # Более подробный вывод ошибки
-                        error_msg = result.stderr if result.stderr else result.stdout or f"Код возврата: {result.returncode}"
-                        
-                        # Показываем больше информации об ошибке (до 500 символов)
-                        error_display = error_msg[:500] if len(error_msg) > 500 else error_msg
-                        
-                        # Извлекаем ключевые части ошибки для лучшего понимания
-                        error_lines = error_msg.split('\n')
-                        key_errors = []
-                        for line in error_lines:
-                            line_lower = line.lower()
-                            if any(keyword in line_lower for keyword in ['error', 'failed', 'не удалось', 'ошибка', 'exception', 'requirement', 'could not', 'no matching', 'building wheel', 'failed building', 'cmake']):
-                                key_errors.append(line.strip())
-                        
-                        if key_errors:
-                            error_summary = '\n'.join(key_errors[:8])  # Первые 8 важных строк
-                            error_display = f"{error_summary}\n\nПолный вывод:\n{error_display}"
-                        
-                        self.root.after(0, lambda l=lib, e=error_display: progress_text.insert(tk.END, f"  ✗ Ошибка установки {l}:\n{e}\n\n"))
-                        error_count += 1
-                        self.root.after(0, lambda ec=error_count, t=total_libs: counter_label.config(
-                            text=f"Ошибок: {ec} из {t}"
-                        ))
-                        try:
-                            # Логируем полную ошибку
-                            logger.error(f"Ошибка установки {lib}: {error_msg}")
-                            self.log(f"Ошибка установки {lib}: {error_msg[:1000]}")
-                        except Exception as e:
-                            logger.debug(f"Не удалось залогировать ошибку установки {lib}: {e}")
-                    
-                    self.root.after(0, lambda: progress_text.see(tk.END))
-                    self.root.after(0, lambda: progress_window.update())
-                    
-                except subprocess.TimeoutExpired:
-                    self.root.after(0, lambda l=lib: progress_text.insert(tk.END, f"✗ Таймаут при установке {l}\n"))
-                    error_count += 1
-                except Exception as e:
-                    self.root.after(0, lambda l=lib, err=str(e): progress_text.insert(tk.END, f"✗ Ошибка {l}: {err[:100]}\n"))
-                    error_count += 1
-                    self.root.after(0, lambda: progress_text.see(tk.END))
-                    self.root.after(0, lambda: progress_window.update())
-            
-            # Останавливаем прогресс-бар
-            self.root.after(0, lambda: progress_bar.stop())
-            
-            # Сохраняем информацию об установленных библиотеках
-            self.save_installed_libraries(installed_libs)
-            
-            # Финальное сообщение
-            failed_libs = [lib for lib in libraries if lib not in installed_libs]
-            
-            if error_count == 0:
-                self.root.after(0, lambda: status_label.config(text="✓ Все библиотеки установлены успешно!"))
-                self.root.after(0, lambda s=success_count, t=total_libs: counter_label.config(
-                    text=f"✓ Успешно установлено: {s} из {t}"
-                ))
-                self.root.after(0, lambda: progress_text.insert(tk.END, "\n✓ Установка завершена успешно!\n"))
-            else:
-                self.root.after(0, lambda sc=success_count, ec=error_count: status_label.config(
-                    text=f"⚠ Установлено: {sc}, Ошибок: {ec}"
-                ))
-                self.root.after(0, lambda sc=success_count, ec=error_count, t=total_libs: counter_label.config(
-                    text=f"Установлено: {sc}, Ошибок: {ec} из {t}"
-                ))
-                self.root.after(0, lambda: progress_text.insert(tk.END, f"\n⚠ Некоторые библиотеки не установлены.\n"))
-                
-                if failed_libs:
-                    self.root.after(0, lambda: progress_text.insert(tk.END, f"\nНеустановленные библиотеки: {', '.join(failed_libs)}\n"))
-                    self.root.after(0, lambda: progress_text.insert(tk.END, f"\nПопробуйте установить вручную через командную строку:\n\n"))
-                    
-                    # Для pdf2docx добавляем специальную рекомендацию с зависимостями
-                    if 'pdf2docx' in failed_libs:
-                        self.root.after(0, lambda: progress_text.insert(tk.END, 
-                            f"Для pdf2docx может потребоваться:\n"
-                            f"  1. Сначала установите зависимости:\n"
-                            f"     pip install --user numpy PyMuPDF\n\n"
-                            f"  2. Затем установите pdf2docx:\n"
-                            f"     pip install --user pdf2docx\n\n"
-                            f"  Или установите все сразу:\n"
-                            f"     pip install --user pdf2docx\n\n"
-                            f"  Если возникает ошибка компиляции, установите Visual Studio Build Tools\n"
-                            f"  или используйте предварительно скомпилированные пакеты:\n"
-                            f"     pip install --user --only-binary :all: pdf2docx\n\n"))
-                        
-                        # Если есть другие библиотеки, показываем их отдельно
-                        other_libs = [lib for lib in failed_libs if lib != 'pdf2docx']
-                        if other_libs:
-                            self.root.after(0, lambda: progress_text.insert(tk.END, 
-                                f"Другие библиотеки:\n"
-                                f"  pip install --user {' '.join(other_libs)}\n\n"))
-                        
-                        # Общая команда для всех
-                        self.root.after(0, lambda: progress_text.insert(tk.END, 
-                            f"Или установите все сразу:\n"
-                            f"  pip install --user {' '.join(failed_libs)}\n"))
-                    else:
-                        # Для остальных библиотек показываем простую команду
-                        self.root.after(0, lambda: progress_text.insert(tk.END, 
-                            f"  pip install --user {' '.join(failed_libs)}\n"))
-            
-            self.root.after(0, lambda: progress_text.see(tk.END))
-            self.root.after(0, lambda: progress_window.update())
-            
-            # Активируем кнопку закрытия
-            self.root.after(0, lambda: close_btn.config(state=tk.NORMAL))
         
         def close_window():
             parent_window.destroy()
             progress_window.destroy()
-            if installed_libs:
+            if job.installed_libs:
                 messagebox.showinfo(
                     "Установка завершена",
                     "Библиотеки установлены успешно.\n"
@@ -1671,6 +2036,657 @@ class LibraryManager:
         )
         close_btn.pack(pady=10)
         
-        threading.Thread(target=install_thread, daemon=True).start()
+        job = _InstallerJob(
+            self, libraries, progress_window, status_label, counter_label,
+            progress_text, progress_bar, close_btn, overall_timeout
+        )
+        job.start()
 
 
+class _InstallerJob:
+    """Установка списка библиотек в фоновом потоке с отображением прогресса.
+    
+    Поток установки не обращается к Tk напрямую: сообщения лога копятся
+    в очереди, для меток запоминается только последний текст, а прочие
+    действия ставятся в очередь вызовов. Все это применяется в главном
+    потоке раз в 50 мс, чтобы не перегружать цикл событий Tk.
+    """
+    
+    def __init__(self, manager: LibraryManager, libraries: List[str],
+                 progress_window: tk.Toplevel, status_label: tk.Label,
+                 counter_label: tk.Label, progress_text: tk.Text,
+                 progress_bar: ttk.Progressbar, close_btn: tk.Button,
+                 overall_timeout: float = 1200):
+        """Инициализация задачи установки.
+        
+        Args:
+            manager: Менеджер библиотек
+            libraries: Список библиотек для установки
+            progress_window: Окно прогресса
+            status_label: Метка текущего статуса
+            counter_label: Метка счетчика библиотек
+            progress_text: Текстовое поле лога установки
+            progress_bar: Индикатор прогресса
+            close_btn: Кнопка закрытия окна (активируется по завершении)
+            overall_timeout: Общее время на установку в секундах
+        """
+        self.manager = manager
+        self.libraries = libraries
+        self.progress_window = progress_window
+        self.status_label = status_label
+        self.counter_label = counter_label
+        self.progress_text = progress_text
+        self.progress_bar = progress_bar
+        self.close_btn = close_btn
+        
+        self.installed_libs: List[str] = []
+        self.success_count = 0
+        self.error_count = 0
+        # Число обработанных библиотек (установленных, пропущенных или с ошибкой)
+        self.completed_count = 0
+        # Имена импорта установленных библиотек для очистки sys.modules
+        self.installed_prefixes: List[str] = []
+        # Каталог с заранее загруженными пакетами для локальной установки
+        self.wheel_dir: Optional[str] = None
+        # Отложенные post-install скрипты: (имя библиотеки, путь к скрипту)
+        self.post_install_tasks: List[Tuple[str, str]] = []
+        self.total_libs = len(libraries)
+        # Версия pip (major, minor), определяется в _check_pip
+        self.pip_version: Tuple[int, int] = (0, 0)
+        # Словарь имен импорта не меняется во время установки
+        self.all_libs_dict = manager.get_all_libraries()
+        # Общий срок установки (time.monotonic), задается при запуске в run
+        self.overall_timeout = overall_timeout
+        self.deadline = time.monotonic() + overall_timeout
+        
+        self._log_queue = queue.Queue()
+        self._pending_labels: Dict[tk.Label, str] = {}
+        self._ui_calls = queue.Queue()
+    
+    def start(self):
+        """Запуск установки в фоновом потоке."""
+        self.progress_window.after(50, self._drain)
+        self.manager._submit_background(self.run)
+    
+    def _append_log(self, message: str):
+        """Добавление сообщения в лог установки (потокобезопасно)."""
+        self._log_queue.put(message)
+    
+    def _set_label(self, label: tk.Label, text: str):
+        """Обновление текста метки (потокобезопасно, промежуточные значения отбрасываются)."""
+        self._pending_labels[label] = text
+    
+    def _ui_call(self, func: Callable, *args, **kwargs):
+        """Выполнение действия с виджетами в главном потоке."""
+        self._ui_calls.put((func, args, kwargs))
+    
+    def _drain(self):
+        """Применение накопленных изменений интерфейса за один проход."""
+        if not self.progress_window.winfo_exists():
+            return
+        chunks = []
+        try:
+            while True:
+                chunks.append(self._log_queue.get_nowait())
+        except queue.Empty:
+            pass
+        if chunks:
+            self.progress_text.insert(tk.END, ''.join(chunks))
+            self.progress_text.see(tk.END)
+        for label in list(self._pending_labels):
+            text = self._pending_labels.pop(label, None)
+            if text is not None:
+                label.config(text=text)
+        try:
+            while True:
+                func, args, kwargs = self._ui_calls.get_nowait()
+                func(*args, **kwargs)
+        except queue.Empty:
+            pass
+        self.progress_window.after(50, self._drain)
+    
+    def _complete_lib(self):
+        """Учет обработанной библиотеки в индикаторе прогресса."""
+        self.completed_count += 1
+        self._ui_call(self.progress_bar.config, value=self.completed_count)
+    
+    def _enable_close(self):
+        """Активация кнопки закрытия окна."""
+        self.close_btn.config(state=tk.NORMAL)
+    
+    def _finish(self):
+        """Активация кнопки закрытия по завершении установки."""
+        self._ui_call(self._enable_close)
+    
+    def _check_pip(self) -> bool:
+        """Проверка доступности pip.
+        
+        Returns:
+            True если pip доступен
+        """
+        self._append_log("🔍 Проверка доступности pip...\n")
+        pip_version = self.manager._get_pip_version()
+        if pip_version is None:
+            self._append_log("✗ pip не доступен. Установите pip вручную.\n")
+            return False
+        version_match = _PIP_VERSION_RE.match(f"pip {pip_version}")
+        if version_match:
+            self.pip_version = (int(version_match.group(1)), int(version_match.group(2)))
+        self._append_log(f"✓ pip {pip_version}\n")
+        return True
+    
+    def _update_sys_path(self):
+        """Добавление пользовательского site-packages в sys.path.
+        
+        site.addsitedir сканирует каталог и .pth файлы, поэтому вызывается
+        один раз до установки и один раз после нее, а не для каждой библиотеки.
+        """
+        try:
+            import site
+            user_site = site.getusersitepackages()
+            with self.manager._install_lock:
+                if user_site and os.path.isdir(user_site) and user_site not in sys.path:
+                    sys.path.insert(0, user_site)
+                    site.addsitedir(user_site)
+        except Exception as e:
+            logger.debug(f"Не удалось обновить sys.path: {e}")
+    
+    def _invalidate_installed_modules(self):
+        """Сброс кэшей импорта для всех установленных библиотек одним вызовом."""
+        with self.manager._install_lock:
+            _forget_installed_modules(self.installed_prefixes)
+    
+    def _on_lib_start(self, idx: int, lib: str):
+        """Отображение начала установки библиотеки."""
+        self._set_label(self.status_label, f"Установка {lib}... ({idx}/{self.total_libs})")
+        self._set_label(self.counter_label, f"Установка: {idx} из {self.total_libs}")
+        self._append_log(f"\n[{idx}/{self.total_libs}] Установка {lib}...\n")
+    
+    def _on_lib_success(self, lib: str):
+        """Обработка успешно установленной библиотеки."""
+        manager = self.manager
+        manager._append_installed_library(lib)
+        # Кэш модулей очищается одним проходом после установки всех библиотек
+        import_name = self.all_libs_dict.get(lib)
+        if import_name:
+            self.installed_prefixes.append(import_name)
+        
+        # post-install скрипт pywin32 запускается после установки всех библиотек,
+        # чтобы не задерживать остальные установки
+        if lib == 'pywin32':
+            self.post_install_tasks.append(
+                (lib, os.path.join(sys.prefix, 'Scripts', 'pywin32_postinstall.py'))
+            )
+        
+        # Проверяем, что библиотека действительно установлена
+        if import_name:
+            # Дожидаемся появления модуля на диске (обычно сразу)
+            manager._activate_installed_module(lib)
+            # Проверяем библиотеку
+            if manager._check_library(lib, import_name):
+                self._append_log(f"  ✓ {lib} установлен успешно\n")
+            else:
+                # Библиотека установлена, но не может быть импортирована сразу
+                # Это нормально для некоторых библиотек, требующих перезапуска
+                self._append_log(f"  ✓ {lib} установлен (может потребоваться перезапуск)\n")
+        else:
+            self._append_log(f"  ✓ {lib} установлен успешно\n")
+        self.success_count += 1
+        self.installed_libs.append(lib)
+        self._complete_lib()
+        self._set_label(self.counter_label, f"Успешно установлено: {self.success_count} из {self.total_libs}")
+    
+    def _on_lib_error(self, lib: str, error_msg: str):
+        """Обработка ошибки установки библиотеки."""
+        # Показываем больше информации об ошибке (до 500 символов)
+        error_display = error_msg[:500] if len(error_msg) > 500 else error_msg
+        
+        # Извлекаем ключевые части ошибки для лучшего понимания
+        key_errors = _extract_key_errors(error_msg, 8)  # Первые 8 важных строк
+        
+        if key_errors:
+            error_summary = '\n'.join(key_errors)
+            error_display = f"{error_summary}\n\nПолный вывод:\n{error_display}"
+        
+        self._append_log(f"  ✗ Ошибка установки {lib}:\n{error_display}\n\n")
+        self.error_count += 1
+        self._complete_lib()
+        self._set_label(self.counter_label, f"Ошибок: {self.error_count} из {self.total_libs}")
+        try:
+            # Логируем полную ошибку
+            logger.error(f"Ошибка установки {lib}: {error_msg}")
+            self.manager.log(f"Ошибка установки {lib}: {error_msg[:1000]}")
+        except Exception as e:
+            logger.debug(f"Не удалось залогировать ошибку установки {lib}: {e}")
+    
+    def _run_postinstall(self, task: Tuple[str, str]):
+        """Запуск post-install скрипта установленной библиотеки.
+        
+        Args:
+            task: Кортеж (имя библиотеки, путь к скрипту)
+        """
+        lib, post_install_script = task
+        try:
+            self._append_log(f"  Запуск post-install скрипта для {lib}...\n")
+            if not os.path.exists(post_install_script):
+                self._append_log(f"  ⚠ {os.path.basename(post_install_script)} не найден\n")
+                return
+            with self.manager._install_file_lock():
+                post_returncode, _ = self.manager._run_pip_stream(
+                    [sys.executable, post_install_script, '-install'],
+                    60,
+                    self._forward_indented
+                )
+            if post_returncode == 0:
+                self._append_log(f"  ✓ {lib} post-install выполнен\n")
+            else:
+                self._append_log(f"  ⚠ {lib} post-install завершился с предупреждением\n")
+        except Exception as e:
+            self._append_log(f"  ⚠ Ошибка post-install для {lib}: {str(e)[:100]}\n")
+    
+    def _forward_indented(self, line: str):
+        """Вывод строки вспомогательного процесса в лог с отступом."""
+        if line.strip():
+            self._append_log(f"    {line}")
+    
+    def _install_batch(self, batch: List[str]) -> Tuple[int, str]:
+        """Установка группы библиотек одним вызовом pip.
+        
+        Список передается файлом требований (-r): один процесс pip разрешает
+        все зависимости сразу и переиспользует метаданные индекса. Вывод
+        читается построчно: строки "Collecting" обновляют статус текущей
+        библиотеки, а при поддержке pip (24.2+) строки --progress-bar=raw
+        показывают процент загрузки.
+        
+        Returns:
+            Кортеж (код возврата, последние строки вывода pip)
+        """
+        timeout_value = sum(600 if lib in ('moviepy', 'pydub') else 300 for lib in batch)
+        requested = {_normalize_dist_name(lib): lib for lib in batch}
+        seen = set()
+        current = {'lib': None, 'num': 0}
+        
+        def on_line(line):
+            progress_match = _PIP_RAW_PROGRESS_RE.match(line)
+            if progress_match:
+                done, total = int(progress_match.group(1)), int(progress_match.group(2))
+                if current['lib'] and total:
+                    self._set_label(
+                        self.status_label,
+                        f"Загрузка {current['lib']}: {done * 100 // total}% ({current['num']}/{len(batch)})"
+                    )
+                return
+            match = _PIP_COLLECTING_RE.match(line)
+            if not match:
+                return
+            lib = requested.get(_normalize_dist_name(match.group(1)))
+            if lib is None or lib in seen:
+                return
+            seen.add(lib)
+            current['lib'], current['num'] = lib, len(seen)
+            self._set_label(self.status_label, f"Установка {lib}... ({len(seen)}/{len(batch)})")
+            self._append_log(f"[{len(seen)}/{len(batch)}] Загрузка {lib}...\n")
+        
+        with self.manager._requirements_file(batch) as req_path, self.manager._install_file_lock():
+            install_cmd = self.manager._get_pip_install_args('-r', req_path)
+            if self.pip_version >= _PIP_RAW_PROGRESS_MIN_VERSION:
+                install_cmd.insert(-1, '--progress-bar=raw')
+            return self.manager._run_pip_stream(install_cmd, self._time_left(timeout_value), on_line)
+    
+    def _download_wheels(self, libs: List[str], dest: str) -> bool:
+        """Загрузка пакетов и их зависимостей в локальный каталог.
+        
+        Args:
+            libs: Список библиотек
+            dest: Каталог для загруженных файлов
+            
+        Returns:
+            True если все пакеты загружены
+        """
+        self._append_log(f"\nЗагрузка {len(libs)} библиотек одним вызовом pip...\n")
+        download_cmd = [sys.executable, '-m', 'pip', 'download', '-d', dest, *_PIP_COMMON_FLAGS, *libs]
+        timeout_value = sum(600 if lib in ('moviepy', 'pydub') else 300 for lib in libs)
+        try:
+            returncode, output = self.manager._run_pip_stream(download_cmd, self._time_left(timeout_value))
+        except subprocess.TimeoutExpired:
+            logger.warning("Таймаут при загрузке пакетов")
+            return False
+        except Exception as e:
+            logger.debug(f"Не удалось загрузить пакеты: {e}")
+            return False
+        if returncode != 0:
+            logger.debug(f"pip download завершился с ошибкой: {output[-500:]}")
+            return False
+        return True
+    
+    def _install_one(self, lib: str) -> Tuple[str, Optional[int], str]:
+        """Установка одной библиотеки отдельным вызовом pip.
+        
+        Только запускает pip и возвращает результат; обработка результата -
+        в _handle_result. Каждый процесс pip выполняется под блокировкой
+        _install_file_lock: общие зависимости (lxml, numpy и т.д.) не должны
+        записываться в site-packages несколькими процессами одновременно.
+        
+        Returns:
+            Кортеж (библиотека, код возврата или None при таймауте, вывод pip)
+        """
+        manager = self.manager
+        # Библиотека могла ждать своей очереди дольше общего срока
+        if self._deadline_passed():
+            return lib, None, ""
+        # Специальная обработка для библиотек, которые могут требовать дополнительные зависимости
+        install_cmd = manager._get_pip_install_args(lib)
+        wheel_dir = self.wheel_dir
+        if wheel_dir and lib != 'pdf2docx':
+            # Пакеты уже загружены в _download_wheels - устанавливаем без сети
+            install_cmd[-1:-1] = ['--no-index', '--find-links', wheel_dir]
+        
+        def forward_line(line):
+            # Строки pip помечаем именем библиотеки
+            if line.strip():
+                self._append_log(f"    [{lib}] {line.rstrip()}\n")
+        
+        # Для pdf2docx может потребоваться numpy, устанавливаем его заранее
+        numpy_installed = False
+        if lib == 'pdf2docx':
+            self._append_log(f"Проверка зависимостей для {lib}...\n")
+            
+            # Пробуем установить numpy если его нет
+            if _is_module_available('numpy'):
+                numpy_installed = True
+            elif not manager._has_matching_wheel('numpy'):
+                self._append_log(f"⚠ Предупреждение: для numpy нет готового wheel под эту платформу, установка пропущена\n")
+            else:
+                try:
+                    self._append_log(f"Установка numpy (зависимость для pdf2docx)...\n")
+                    
+                    # Используем --only-binary для numpy чтобы избежать компиляции
+                    numpy_cmd = manager._get_pip_install_args('numpy')
+                    numpy_cmd.insert(-1, '--only-binary')
+                    numpy_cmd.insert(-1, ':all:')
+                    with manager._install_file_lock():
+                        numpy_returncode, numpy_output = manager._run_pip_stream(numpy_cmd, self._time_left(300), forward_line)
+                    if numpy_returncode == 0:
+                        self._append_log(f"✓ numpy установлен как зависимость\n")
+                        numpy_installed = True
+                    else:
+                        numpy_error = numpy_output or "Неизвестная ошибка"
+                        # Извлекаем ключевые ошибки
+                        key_errors = _extract_key_errors(numpy_error, 3)
+                        error_summary = '\n'.join(key_errors) if key_errors else numpy_error[:300]
+                        self._append_log(f"⚠ Предупреждение: не удалось установить numpy:\n{error_summary[:400]}\n")
+                except Exception as numpy_e:
+                    self._append_log(f"⚠ Предупреждение: ошибка установки numpy: {str(numpy_e)[:100]}\n")
+            
+            # Пробуем установить PyMuPDF если его нет
+            pymupdf_missing = not _is_module_available('fitz')
+            if pymupdf_missing and not manager._has_matching_wheel('PyMuPDF'):
+                self._append_log(f"⚠ Предупреждение: для PyMuPDF нет готового wheel под эту платформу, установка пропущена\n")
+            elif pymupdf_missing:
+                try:
+                    self._append_log(f"Установка PyMuPDF (зависимость для pdf2docx)...\n")
+                    
+                    pymupdf_cmd = manager._get_pip_install_args('PyMuPDF')
+                    with manager._install_file_lock():
+                        pymupdf_returncode, pymupdf_output = manager._run_pip_stream(pymupdf_cmd, self._time_left(300), forward_line)
+                    if pymupdf_returncode == 0:
+                        self._append_log(f"✓ PyMuPDF установлен как зависимость\n")
+                    else:
+                        pymupdf_error = pymupdf_output or "Неизвестная ошибка"
+                        self._append_log(f"⚠ Предупреждение: не удалось установить PyMuPDF:\n{pymupdf_error[:300]}\n")
+                except Exception as pymupdf_e:
+                    self._append_log(f"⚠ Предупреждение: ошибка установки PyMuPDF: {str(pymupdf_e)[:100]}\n")
+            
+            # Для pdf2docx: всегда используем --only-binary :all: чтобы использовать только wheels
+            install_cmd.insert(-1, '--only-binary')
+            install_cmd.insert(-1, ':all:')
+            if numpy_installed:
+                # Если numpy уже установлен, также используем --no-deps
+                install_cmd.insert(-1, '--no-deps')
+                self._append_log(f"Установка pdf2docx только из wheels без зависимостей (numpy уже установлен)...\n")
+            else:
+                self._append_log(f"Установка pdf2docx только из wheels...\n")
+            install_cmd.extend(['--no-cache-dir'])
+        
+        # Без готового wheel pip стал бы собирать пакет из исходников
+        if lib in _COMPILE_PRONE_PACKAGES and not manager._has_matching_wheel(lib):
+            return lib, 1, f"Нет готового wheel для {lib} под эту платформу, сборка из исходников требует компилятор (compiler)"
+        
+        # Увеличиваем таймаут для тяжелых библиотек
+        timeout_value = 600 if lib in ('pdf2docx', 'moviepy', 'pydub') else 300
+        
+        try:
+            with manager._install_file_lock():
+                returncode, output = manager._run_pip_stream(install_cmd, self._time_left(timeout_value), forward_line)
+        except subprocess.TimeoutExpired:
+            return lib, None, ""
+        return lib, returncode, output or f"Код возврата: {returncode}"
+    
+    def _handle_result(self, lib: str, returncode: Optional[int], output: str):
+        """Обработка результата установки одной библиотеки."""
+        if returncode is None:
+            self._append_log(f"✗ Таймаут при установке {lib}\n")
+            self.error_count += 1
+            self._complete_lib()
+            return
+        
+        # Специальная обработка для pdf2docx - если установка не удалась из-за компиляции,
+        # пропускаем её с предупреждением (библиотека не критична)
+        if lib == 'pdf2docx' and returncode != 0:
+            if 'compiler' in output.lower() or 'building wheel' in output.lower() or 'meson' in output.lower() or 'numpy' in output.lower():
+                self._append_log(f"  ⚠ pdf2docx не установлен (требует компилятор). Библиотека не критична.\n")
+                self._append_log(f"  Вы можете установить её вручную позже: pip install pdf2docx\n")
+                # Не считаем это ошибкой, просто пропускаем
+                self._complete_lib()
+                return
+        
+        if returncode == 0:
+            self._on_lib_success(lib)
+        else:
+            self._on_lib_error(lib, output)
+    
+    def _handle_exception(self, lib: str, e: Exception):
+        """Обработка непредвиденной ошибки установки библиотеки."""
+        self._append_log(f"✗ Ошибка {lib}: {str(e)[:100]}\n")
+        self.error_count += 1
+        self._complete_lib()
+    
+    def _time_left(self, timeout: float) -> float:
+        """Таймаут вызова pip с учетом общего срока установки.
+        
+        Args:
+            timeout: Собственный таймаут вызова в секундах
+            
+        Returns:
+            Меньшее из timeout и времени до общего срока (не меньше 1 секунды)
+        """
+        return max(1.0, min(timeout, self.deadline - time.monotonic()))
+    
+    def _deadline_passed(self) -> bool:
+        """Проверка, истек ли общий срок установки."""
+        return time.monotonic() >= self.deadline
+    
+    def run(self):
+        """Установка библиотек (выполняется в отдельном потоке)."""
+        self.deadline = time.monotonic() + self.overall_timeout
+        # Момент начала установки: по нему выбираются пакеты для компиляции
+        install_started = time.time()
+        self._set_label(self.counter_label, f"Библиотек для установки: {self.total_libs}")
+        
+        if not self._check_pip():
+            self._finish()
+            return
+        
+        # Обновляем sys.path для обнаружения новых модулей
+        self._update_sys_path()
+        
+        # Валидация имен библиотек для безопасности
+        valid_libs = []
+        for lib in self.libraries:
+            if not _is_valid_lib_name(lib):
+                error_msg = f"Недопустимое имя библиотеки: {lib}"
+                self._append_log(f"✗ Ошибка валидации {lib}: {error_msg}\n")
+                self.error_count += 1
+                self._complete_lib()
+                continue
+            valid_libs.append(lib)
+        
+        # Уже установленные пакеты не передаем в pip: каждый вызов тратит
+        # секунды на запуск резолвера даже для "Requirement already satisfied"
+        installed_set = self.manager._get_installed_distributions() if valid_libs else None
+        if installed_set:
+            skipped_libs = [lib for lib in valid_libs if _normalize_dist_name(lib) in installed_set]
+            if skipped_libs:
+                skipped_set = set(skipped_libs)
+                valid_libs = [lib for lib in valid_libs if lib not in skipped_set]
+                for lib in skipped_libs:
+                    self.installed_libs.append(lib)
+                    self.success_count += 1
+                    self._complete_lib()
+                self._append_log(f"✓ Уже установлены: {', '.join(skipped_libs)}\n")
+                self._set_label(self.counter_label, f"Установлено: {self.success_count} из {self.total_libs}")
+        
+        installed_before_pip = len(self.installed_libs)
+        
+        # pdf2docx требует отдельной установки только из wheels
+        batch_libs = [lib for lib in valid_libs if lib != 'pdf2docx']
+        single_libs = [lib for lib in valid_libs if lib == 'pdf2docx']
+        
+        # Остальные библиотеки устанавливаем одним вызовом pip
+        if len(batch_libs) > 1:
+            self._append_log(f"\nУстановка {len(batch_libs)} библиотек одним вызовом pip...\n")
+            self._set_label(self.counter_label, f"Установка: {len(batch_libs)} из {self.total_libs}")
+            try:
+                batch_returncode, batch_output = self._install_batch(batch_libs)
+            except subprocess.TimeoutExpired:
+                batch_returncode, batch_output = None, "Таймаут при пакетной установке"
+            except Exception as e:
+                batch_returncode, batch_output = None, str(e)
+            
+            if batch_returncode == 0:
+                for lib in batch_libs:
+                    self._on_lib_success(lib)
+                batch_libs = []
+            else:
+                # Одна проблемная библиотека прерывает весь вызов pip,
+                # поэтому повторяем установку по одной для точной диагностики
+                logger.warning(f"Пакетная установка не удалась: {batch_output[-500:]}")
+                self._append_log("⚠ Пакетная установка не удалась, установка по одной...\n")
+        
+        # Библиотеки устанавливаем по одной: параллельные процессы pip
+        # записывали бы общие зависимости в один site-packages одновременно.
+        # Сеть используется только при загрузке, которая идет одним вызовом
+        idx = len(self.installed_libs)
+        local_libs = [lib for lib in batch_libs if lib not in _SERIAL_INSTALL_LIBS]
+        serial_libs = [lib for lib in batch_libs if lib in _SERIAL_INSTALL_LIBS] + single_libs
+        if local_libs:
+            import shutil
+            # Каталог постоянный: после сбоя повторная попытка не скачивает
+            # заново уже загруженные пакеты (pip download их пропускает)
+            wheel_dir = self.manager.wheel_cache_dir
+            os.makedirs(wheel_dir, exist_ok=True)
+            try:
+                # Все пакеты скачиваются одним процессом pip (одно HTTPS-соединение
+                # с PyPI), после чего установка идет локально без обращения к сети
+                if len(local_libs) > 1 and self._download_wheels(local_libs, wheel_dir):
+                    self.wheel_dir = wheel_dir
+                for lib in local_libs:
+                    idx += 1
+                    self._on_lib_start(idx, lib)
+                    try:
+                        self._handle_result(*self._install_one(lib))
+                    except Exception as e:
+                        self._handle_exception(lib, e)
+            finally:
+                self.wheel_dir = None
+                # Загруженные пакеты храним только до успешной установки
+                if set(local_libs).issubset(self.installed_libs):
+                    shutil.rmtree(wheel_dir, ignore_errors=True)
+        
+        for lib in serial_libs:
+            idx += 1
+            self._on_lib_start(idx, lib)
+            try:
+                self._handle_result(*self._install_one(lib))
+            except Exception as e:
+                self._handle_exception(lib, e)
+        
+        # Каталог пользовательских пакетов мог появиться только во время установки
+        self._update_sys_path()
+        self._invalidate_installed_modules()
+        
+        # Post-install скрипты выполняются по одному после основной установки:
+        # каждый берет межпроцессную блокировку установки
+        if self.post_install_tasks:
+            self._set_label(self.status_label, "Завершение установки...")
+            for task in self.post_install_tasks:
+                self._run_postinstall(task)
+        
+        # pip устанавливал пакеты без компиляции байткода - компилируем только
+        # что установленные пакеты разом, если общий срок еще не истек
+        if len(self.installed_libs) > installed_before_pip and not self._deadline_passed():
+            self._set_label(self.status_label, "Компиляция байткода...")
+            self._append_log("\nКомпиляция байткода...\n")
+            self.manager.compile_installed_packages(install_started, self._time_left(600))
+        
+        # Сохраняем информацию об установленных библиотеках
+        self.manager.save_installed_libraries(self.installed_libs)
+        
+        # Финальное сообщение
+        installed_names = set(self.installed_libs)
+        failed_libs = [lib for lib in self.libraries if lib not in installed_names]
+        self._report_summary(failed_libs)
+        
+        self._finish()
+    
+    def _report_summary(self, failed_libs: List[str]):
+        """Вывод итогов установки и команд для ручной установки.
+        
+        Args:
+            failed_libs: Список неустановленных библиотек
+        """
+        if self.error_count == 0:
+            self._set_label(self.status_label, "✓ Все библиотеки установлены успешно!")
+            self._set_label(self.counter_label, f"✓ Успешно установлено: {self.success_count} из {self.total_libs}")
+            self._append_log("\n✓ Установка завершена успешно!\n")
+            return
+        
+        self._set_label(self.status_label, f"⚠ Установлено: {self.success_count}, Ошибок: {self.error_count}")
+        self._set_label(self.counter_label, f"Установлено: {self.success_count}, Ошибок: {self.error_count} из {self.total_libs}")
+        self._append_log(f"\n⚠ Некоторые библиотеки не установлены.\n")
+        
+        if not failed_libs:
+            return
+        
+        self._append_log(f"\nНеустановленные библиотеки: {', '.join(failed_libs)}\n")
+        self._append_log(f"\nПопробуйте установить вручную через командную строку:\n\n")
+        
+        # Для pdf2docx добавляем специальную рекомендацию с зависимостями
+        if 'pdf2docx' in failed_libs:
+            self._append_log(
+                f"Для pdf2docx может потребоваться:\n"
+                f"  1. Сначала установите зависимости:\n"
+                f"     pip install --user numpy PyMuPDF\n\n"
+                f"  2. Затем установите pdf2docx:\n"
+                f"     pip install --user pdf2docx\n\n"
+                f"  Или установите все сразу:\n"
+                f"     pip install --user pdf2docx\n\n"
+                f"  Если возникает ошибка компиляции, установите Visual Studio Build Tools\n"
+                f"  или используйте предварительно скомпилированные пакеты:\n"
+                f"     pip install --user --only-binary :all: pdf2docx\n\n")
+            
+            # Если есть другие библиотеки, показываем их отдельно
+            other_libs = [lib for lib in failed_libs if lib != 'pdf2docx']
+            if other_libs:
+                self._append_log(
+                    f"Другие библиотеки:\n"
+                    f"  pip install --user {' '.join(other_libs)}\n\n")
+            
+            # Общая команда для всех
+            self._append_log(
+                f"Или установите все сразу:\n"
+                f"  pip install --user {' '.join(failed_libs)}\n")
+        else:
+            # Для остальных библиотек показываем простую команду
+            self._append_log(
+                f"  pip install --user {' '.join(failed_libs)}\n")
@@ -4,11 +4,23 @@
 в JSON формате. Настройки сохраняются в домашней директории пользователя.
 """
 
+import atexit
 import json
 import logging
+import mmap
 import os
+import threading
+import weakref
 from typing import Dict, Any, Optional
 
+# orjson (опционально) разбирает и сериализует JSON быстрее стандартного модуля
+HAS_ORJSON = False
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
 try:
     from config.constants import get_settings_file_path, get_templates_file_path
     SETTINGS_FILE_PATH = get_settings_file_path()
@@ -29,6 +41,186 @@ except ImportError:
 # Настройка логирования
 logger = logging.getLogger(__name__)
 
+# Файлы больше этого размера отображаются в память вместо чтения целиком
+_MMAP_MIN_SIZE = 64 * 1024
+
+# Задержка записи на диск: сохранения чаще этого интервала объединяются
+_SAVE_DELAY_SECONDS = 0.2
+
+
+def _load_json_file(path: str) -> Any:
+    """Чтение JSON файла.
+    
+    Args:
+        path: Путь к файлу
+        
+    Returns:
+        Разобранные данные
+        
+    Raises:
+        json.JSONDecodeError: Если файл содержит неверный JSON
+        OSError: Если файл не удалось прочитать
+    """
+    with open(path, 'rb') as f:
+        # orjson разбирает memoryview отображенного файла без копирования
+        # в промежуточную строку; маленькие файлы проще прочитать целиком
+        if HAS_ORJSON and os.fstat(f.fileno()).st_size >= _MMAP_MIN_SIZE:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, memoryview(mm) as view:
+                # orjson.JSONDecodeError - подкласс json.JSONDecodeError
+                return orjson.loads(view)
+        data = f.read()
+    if HAS_ORJSON:
+        return orjson.loads(data)
+    return json.loads(data.decode('utf-8'))
+
+
+# Все созданные объекты отложенной записи; при выходе из программы их
+# несохраненные данные записываются одним обработчиком atexit
+_writers: "weakref.WeakSet[_DelayedJsonWriter]" = weakref.WeakSet()
+
+
+def _flush_all_writers() -> None:
+    """Запись несохраненных данных всех объектов отложенной записи."""
+    for writer in list(_writers):
+        writer.flush()
+
+
+atexit.register(_flush_all_writers)
+
+
+def _dump_json(obj: Any) -> bytes:
+    """Сериализация данных в JSON.
+    
+    Args:
+        obj: Данные для сохранения
+        
+    Returns:
+        JSON в кодировке UTF-8
+        
+    Raises:
+        TypeError: Если данные не сериализуются в JSON
+    """
+    if HAS_ORJSON:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, ensure_ascii=False, indent=2).encode('utf-8')
+
+
+def _save_json_file(path: str, payload: bytes) -> None:
+    """Запись JSON в файл одним вызовом write.
+    
+    Args:
+        path: Путь к файлу
+        payload: Данные, подготовленные _dump_json
+        
+    Raises:
+        OSError: Если файл не удалось записать
+    """
+    # Пишем во временный файл и атомарно заменяем им старый, чтобы сбой
+    # посреди записи не оставил поврежденный файл настроек
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(payload)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+class _DelayedJsonWriter:
+    """Отложенная запись данных в JSON файл.
+    
+    Несколько сохранений подряд (например, при переключении настроек)
+    объединяются в одну запись через _SAVE_DELAY_SECONDS после последнего
+    вызова. Несохраненные данные записываются при выходе из программы.
+    """
+    
+    def __init__(self, path: str, description: str):
+        """Инициализация отложенной записи.
+        
+        Args:
+            path: Путь к файлу
+            description: Название данных для сообщений лога
+        """
+        self.path = path
+        self.description = description
+        # Снимок данных, сериализованный в момент планирования записи
+        # (None - последние данные не удалось сериализовать)
+        self._payload: Optional[bytes] = None
+        self._dirty = False
+        self._timer: Optional[threading.Timer] = None
+        # Хэш последнего записанного (или прочитанного) содержимого файла
+        self._last_hash: Optional[int] = None
+        self._lock = threading.Lock()
+        _writers.add(self)
+    
+    def remember(self, data: Any) -> None:
+        """Запоминание данных, которые уже совпадают с содержимым файла.
+        
+        Args:
+            data: Данные, только что загруженные из файла
+        """
+        try:
+            payload = _dump_json(data)
+        except Exception:
+            return
+        with self._lock:
+            self._last_hash = hash(payload)
+    
+    def schedule(self, data: Any) -> None:
+        """Планирование записи данных.
+        
+        Args:
+            data: Данные для сохранения (сериализуются сразу: вызывающий код
+                может изменить их до отложенной записи)
+        """
+        try:
+            payload: Optional[bytes] = _dump_json(data)
+        except Exception as e:
+            logger.error(f"Ошибка сохранения {self.description}: {e}", exc_info=True)
+            payload = None
+        with self._lock:
+            self._payload = payload
+            self._dirty = True
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if payload is None:
+                return
+            self._timer = threading.Timer(_SAVE_DELAY_SECONDS, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+    
+    def flush(self) -> bool:
+        """Немедленная запись несохраненных данных.
+        
+        Returns:
+            True если данные записаны или записывать нечего, False при ошибке
+        """
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not self._dirty:
+                return True
+            if self._payload is None:
+                return False
+            try:
+                # Неизменившиеся данные (например, диалог закрыт без правок)
+                # на диск не записываем
+                payload_hash = hash(self._payload)
+                if payload_hash != self._last_hash:
+                    _save_json_file(self.path, self._payload)
+                    self._last_hash = payload_hash
+            except Exception as e:
+                logger.error(f"Ошибка сохранения {self.description}: {e}", exc_info=True)
+                return False
+            self._dirty = False
+            return True
+
 
 class SettingsManager:
     """Класс для управления настройками приложения.
@@ -38,6 +230,8 @@ class SettingsManager:
     Поддерживает значения по умолчанию для всех настроек.
     """
     
+    __slots__ = ('settings_file', 'settings', '_writer')
+    
     DEFAULT_SETTINGS = {
         'auto_apply': False,
         'show_warnings': True,
@@ -45,10 +239,18 @@ class SettingsManager:
         'backup': False
     }
     
-    REQUIRED_SETTINGS_KEYS = {'auto_apply', 'show_warnings', 'font_size', 'backup'}
+    # Обязательные настройки и допустимые типы их значений
+    SETTINGS_SCHEMA = {
+        'auto_apply': bool,
+        'show_warnings': bool,
+        'backup': bool,
+        'font_size': (str, int),
+    }
+    
+    REQUIRED_SETTINGS_KEYS = frozenset(SETTINGS_SCHEMA)
     
-    @staticmethod
-    def validate_settings(settings: Dict[str, Any]) -> bool:
+    @classmethod
+    def validate_settings(cls, settings: Dict[str, Any]) -> bool:
         """Валидация структуры настроек.
         
         Args:
@@ -57,24 +259,11 @@ class SettingsManager:
         Returns:
             True если настройки валидны, False в противном случае
         """
-        if not isinstance(settings, dict):
-            return False
-        
-        # Проверяем наличие обязательных ключей
-        if not all(key in settings for key in SettingsManager.REQUIRED_SETTINGS_KEYS):
-            return False
-        
-        # Проверяем типы значений
-        if not isinstance(settings.get('auto_apply'), bool):
-            return False
-        if not isinstance(settings.get('show_warnings'), bool):
-            return False
-        if not isinstance(settings.get('backup'), bool):
-            return False
-        if not isinstance(settings.get('font_size'), (str, int)):
-            return False
-        
-        return True
+        # Все обязательные ключи присутствуют и значения имеют нужный тип
+        return isinstance(settings, dict) and all(
+            key in settings and isinstance(settings[key], value_type)
+            for key, value_type in cls.SETTINGS_SCHEMA.items()
+        )
     
     def __init__(self, settings_file: Optional[str] = None):
         """Инициализация менеджера настроек.
@@ -83,20 +272,13 @@ class SettingsManager:
             settings_file: Путь к файлу настроек
         """
         if settings_file is None:
-            try:
-                settings_file = SETTINGS_FILE_PATH
-            except NameError:
-                # Fallback если константы не загружены
-                app_data_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-                data_dir = os.path.join(app_data_dir, "data")
-                if not os.path.exists(data_dir):
-                    try:
-                        os.makedirs(data_dir, exist_ok=True)
-                    except (OSError, PermissionError):
-                        pass
-                settings_file = os.path.join(data_dir, "rename-plus_settings.json")
+            # Путь по умолчанию (с fallback) определяется при импорте модуля
+            settings_file = SETTINGS_FILE_PATH
         self.settings_file = settings_file
+        self._writer = _DelayedJsonWriter(settings_file, "настроек")
+        # Настройки нужны уже при запуске (тема окна), поэтому читаются сразу
         self.settings = self.load_settings()
+        self._writer.remember(self.settings)
     
     def load_settings(self) -> Dict[str, Any]:
         """Загрузка настроек из файла.
@@ -107,16 +289,15 @@ class SettingsManager:
         settings = self.DEFAULT_SETTINGS.copy()
         try:
             if os.path.exists(self.settings_file):
-                with open(self.settings_file, 'r', encoding='utf-8') as f:
-                    loaded = json.load(f)
-                    if isinstance(loaded, dict):
-                        # Валидируем загруженные настройки
-                        if self.validate_settings(loaded):
-                            settings.update(loaded)
-                        else:
-                            logger.warning(f"Файл настроек содержит неверный формат, используются настройки по умолчанию: {self.settings_file}")
+                loaded = _load_json_file(self.settings_file)
+                if isinstance(loaded, dict):
+                    # Валидируем загруженные настройки
+                    if self.validate_settings(loaded):
+                        settings.update(loaded)
                     else:
-                        logger.warning(f"Файл настроек содержит неверный формат: {self.settings_file}")
+                        logger.warning(f"Файл настроек содержит неверный формат, используются настройки по умолчанию: {self.settings_file}")
+                else:
+                    logger.warning(f"Файл настроек содержит неверный формат: {self.settings_file}")
         except json.JSONDecodeError as e:
             logger.error(f"Ошибка парсинга JSON в настройках: {e}", exc_info=True)
         except (OSError, PermissionError, ValueError) as e:
@@ -125,25 +306,37 @@ class SettingsManager:
             logger.error(f"Неожиданная ошибка загрузки настроек: {e}", exc_info=True)
         return settings
     
-    def save_settings(self, settings_dict: Optional[Dict[str, Any]] = None) -> bool:
+    def save_settings(self, settings_dict: Optional[Dict[str, Any]] = None,
+                      wait: bool = False) -> bool:
         """Сохранение настроек в файл.
         
+        По умолчанию запись выполняется с задержкой _SAVE_DELAY_SECONDS, чтобы
+        частые сохранения объединялись; ошибки отложенной записи только
+        записываются в лог. Если результат нужен вызывающему коду, передайте
+        wait=True.
+        
         Args:
             settings_dict: Словарь с настройками (если None, используется self.settings)
+            wait: Записать сразу и вернуть результат записи
         
         Returns:
-            True если успешно, False в противном случае
+            При wait=True - True если файл записан; иначе True (запись запланирована)
         """
         if settings_dict is None:
             settings_dict = self.settings
-        try:
-            with open(self.settings_file, 'w', encoding='utf-8') as f:
-                json.dump(settings_dict, f, ensure_ascii=False, indent=2)
-            self.settings = settings_dict
-            return True
-        except Exception as e:
-            logger.error(f"Ошибка сохранения настроек: {e}", exc_info=True)
-            return False
+        self.settings = settings_dict
+        self._writer.schedule(settings_dict)
+        if wait:
+            return self._writer.flush()
+        return True
+    
+    def flush(self) -> bool:
+        """Немедленная запись отложенных изменений настроек.
+        
+        Returns:
+            True если успешно, False в противном случае
+        """
+        return self._writer.flush()
     
     def get(self, key: str, default: Any = None) -> Any:
         """Получение значения настройки.
@@ -170,6 +363,8 @@ class SettingsManager:
 class TemplatesManager:
     """Класс для управления шаблонами."""
     
+    __slots__ = ('templates_file', '_templates', '_writer')
+    
     def __init__(self, templates_file: Optional[str] = None):
         """Инициализация менеджера шаблонов.
         
@@ -177,20 +372,24 @@ class TemplatesManager:
             templates_file: Путь к файлу шаблонов
         """
         if templates_file is None:
-            try:
-                templates_file = TEMPLATES_FILE_PATH
-            except NameError:
-                # Fallback если константы не загружены
-                app_data_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-                data_dir = os.path.join(app_data_dir, "data")
-                if not os.path.exists(data_dir):
-                    try:
-                        os.makedirs(data_dir, exist_ok=True)
-                    except (OSError, PermissionError):
-                        pass
-                templates_file = os.path.join(data_dir, "rename-plus_templates.json")
+            # Путь по умолчанию (с fallback) определяется при импорте модуля
+            templates_file = TEMPLATES_FILE_PATH
         self.templates_file = templates_file
-        self.templates = self.load_templates()
+        # Файл читается при первом обращении к templates (см. свойство)
+        self._templates: Optional[Dict[str, Any]] = None
+        self._writer = _DelayedJsonWriter(templates_file, "шаблонов")
+    
+    @property
+    def templates(self) -> Dict[str, Any]:
+        """Словарь шаблонов; загружается из файла при первом обращении."""
+        if self._templates is None:
+            self._templates = self.load_templates()
+            self._writer.remember(self._templates)
+        return self._templates
+    
+    @templates.setter
+    def templates(self, value: Dict[str, Any]) -> None:
+        self._templates = value
     
     def load_templates(self) -> Dict[str, Any]:
         """Загрузка сохраненных шаблонов из файла.
@@ -201,18 +400,16 @@ class TemplatesManager:
         templates = {}
         try:
             if os.path.exists(self.templates_file):
-                with open(self.templates_file, 'r', encoding='utf-8') as f:
-                    loaded = json.load(f)
-                    if isinstance(loaded, dict):
-                        # Валидируем шаблоны (должны быть строками)
-                        # Валидируем шаблоны (должны быть строками)
-                        for key, value in loaded.items():
-                            if isinstance(key, str) and isinstance(value, str):
-                                templates[key] = value
-                            else:
-                                logger.warning(f"Неверный формат шаблона '{key}': ожидается строка")
-                    else:
-                        logger.warning(f"Файл шаблонов содержит неверный формат: {self.templates_file}")
+                loaded = _load_json_file(self.templates_file)
+                if isinstance(loaded, dict):
+                    # Валидируем шаблоны (должны быть строками)
+                    for key, value in loaded.items():
+                        if isinstance(key, str) and isinstance(value, str):
+                            templates[key] = value
+                        else:
+                            logger.warning(f"Неверный формат шаблона '{key}': ожидается строка")
+                else:
+                    logger.warning(f"Файл шаблонов содержит неверный формат: {self.templates_file}")
         except json.JSONDecodeError as e:
             logger.error(f"Ошибка парсинга JSON в шаблонах: {e}", exc_info=True)
         except (OSError, PermissionError, ValueError) as e:
@@ -221,25 +418,37 @@ class TemplatesManager:
             logger.error(f"Неожиданная ошибка загрузки шаблонов: {e}", exc_info=True)
         return templates
     
-    def save_templates(self, templates: Optional[Dict[str, Any]] = None) -> bool:
+    def save_templates(self, templates: Optional[Dict[str, Any]] = None,
+                       wait: bool = False) -> bool:
         """Сохранение шаблонов в файл.
         
+        По умолчанию запись выполняется с задержкой _SAVE_DELAY_SECONDS, чтобы
+        частые сохранения объединялись; ошибки отложенной записи только
+        записываются в лог. Если результат нужен вызывающему коду, передайте
+        wait=True.
+        
         Args:
             templates: Словарь с шаблонами (если None, используется self.templates)
+            wait: Записать сразу и вернуть результат записи
         
         Returns:
-            True если успешно, False в противном случае
+            При wait=True - True если файл записан; иначе True (запись запланирована)
         """
         if templates is None:
             templates = self.templates
-        try:
-            with open(self.templates_file, 'w', encoding='utf-8') as f:
-                json.dump(templates, f, ensure_ascii=False, indent=2)
-            self.templates = templates
-            return True
-        except Exception as e:
-            logger.error(f"Ошибка сохранения шаблонов: {e}", exc_info=True)
-            return False
+        self._templates = templates
+        self._writer.schedule(templates)
+        if wait:
+            return self._writer.flush()
+        return True
+    
+    def flush(self) -> bool:
+        """Немедленная запись отложенных изменений шаблонов.
+        
+        Returns:
+            True если успешно, False в противном случае
+        """
+        return self._writer.flush()
     
     def get(self, key: str, default: Any = None) -> Any:
         """Получение шаблона.
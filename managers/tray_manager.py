@@ -1,35 +1,131 @@
 """Модуль для управления системным треем."""
 
+import glob
+import hashlib
+import importlib.util
 import logging
 import os
 import threading
 import tkinter as tk
-from typing import Callable, Optional, TYPE_CHECKING
+from typing import Callable, Dict, Optional, Tuple, TYPE_CHECKING
 
-# Попытка импортировать pystray
-HAS_PYSTRAY = False
+# pystray и Pillow импортируются только в потоке трея (см. TrayManager._run_tray),
+# чтобы не замедлять запуск приложения
 if TYPE_CHECKING:
     import pystray
-    from pystray import MenuItem
+    from PIL import Image as PILImage
 
-try:
-    import pystray
-    from pystray import MenuItem as item
+# Размер иконки в трее
+_TRAY_ICON_SIZE = (64, 64)
+# Возможные файлы иконки трея в materials/icon (в порядке предпочтения)
+_TRAY_ICON_NAMES = ("icon.ico", "1000x1000.png")
+# Шаблон имени файла с уменьшенной иконкой в директории данных; {key} -
+# отпечаток исходного файла (путь, время изменения, размер)
+_TRAY_ICON_CACHE_FILE = "rename-plus_tray_icon_{key}.png"
+# Уже загруженные иконки в текущем сеансе: (путь, mtime) -> изображение
+_loaded_icons: Dict[Tuple[str, float], "PILImage.Image"] = {}
+
+
+def _get_tray_icon_cache_path(icon_path: str, st: os.stat_result) -> Optional[str]:
+    """Получение пути к уменьшенной копии иконки трея.
+    
+    Путь, время изменения и размер исходного файла входят в имя копии:
+    другой или измененный исходный файл (в том числе более старый, например
+    после обновления программы) получает свою копию.
+    
+    Args:
+        icon_path: Путь к исходной иконке
+        st: Результат os.stat для исходной иконки
+        
+    Returns:
+        Путь в директории данных или None, если она недоступна
+    """
+    try:
+        from config.constants import get_data_dir
+    except ImportError:
+        return None
+    fingerprint = f"{os.path.abspath(icon_path)}|{st.st_mtime_ns}|{st.st_size}"
+    key = hashlib.sha1(fingerprint.encode('utf-8')).hexdigest()[:16]
+    return os.path.join(get_data_dir(), _TRAY_ICON_CACHE_FILE.format(key=key))
+
+
+def _load_tray_icon(icon_path: str) -> "PILImage.Image":
+    """Загрузка иконки трея нужного размера.
+    
+    Уменьшение исходной картинки (LANCZOS) выполняется один раз: результат
+    сохраняется в директории данных и используется при следующих запусках,
+    пока исходный файл тот же (см. _get_tray_icon_cache_path). Повторная
+    настройка трея в том же сеансе берет готовое изображение из памяти.
+    
+    Args:
+        icon_path: Путь к исходной иконке
+        
+    Returns:
+        Изображение размером _TRAY_ICON_SIZE
+    """
     from PIL import Image as PILImage
-    HAS_PYSTRAY = True
-except ImportError:
-    HAS_PYSTRAY = False
-    # Создаем заглушки для type hints, если pystray не установлен
-    class pystray:
-        class Icon:
-            pass
-        class MenuItem:
-            pass
+    
+    st = os.stat(icon_path)
+    icon_mtime = st.st_mtime
+    loaded = _loaded_icons.get((icon_path, icon_mtime))
+    if loaded is not None:
+        return loaded
+    
+    cache_path = _get_tray_icon_cache_path(icon_path, st)
+    if cache_path:
+        try:
+            img = PILImage.open(cache_path)
+            img.load()
+            if img.size == _TRAY_ICON_SIZE:
+                _loaded_icons[(icon_path, icon_mtime)] = img
+                return img
+        except OSError:
+            pass  # Копии еще нет или она повреждена - создаем заново
+    
+    with PILImage.open(icon_path) as source:
+        if source.size == _TRAY_ICON_SIZE:
+            # Иконка уже нужного размера - пересчет не нужен
+            img = source.copy()
+        else:
+            img = source.resize(_TRAY_ICON_SIZE, PILImage.Resampling.LANCZOS)
+    _loaded_icons[(icon_path, icon_mtime)] = img
+    if cache_path:
+        try:
+            # Копии от прежних исходных файлов больше не нужны
+            pattern = _TRAY_ICON_CACHE_FILE.format(key='*')
+            for old_path in glob.glob(os.path.join(os.path.dirname(cache_path), pattern)):
+                if old_path != cache_path:
+                    os.remove(old_path)
+            img.save(cache_path, 'PNG', optimize=True)
+        except OSError as e:
+            logging.getLogger(__name__).debug(f"Не удалось сохранить копию иконки трея: {e}")
+    return img
 
 
 class TrayManager:
     """Класс для управления системным треем."""
     
+    __slots__ = (
+        'root', 'show_callback', 'quit_callback', 'tray_icon', 'tray_thread',
+        '_stop_requested',
+    )
+    
+    # Результат проверки наличия pystray и Pillow (вычисляется один раз)
+    _available: Optional[bool] = None
+    
+    @classmethod
+    def available(cls) -> bool:
+        """Проверка наличия pystray и Pillow без их импорта.
+        
+        Returns:
+            True если обе библиотеки установлены
+        """
+        if cls._available is None:
+            cls._available = all(
+                importlib.util.find_spec(name) is not None for name in ("pystray", "PIL")
+            )
+        return cls._available
+    
     def __init__(self, root: tk.Tk, 
                  show_callback: Callable[[], None],
                  quit_callback: Callable[[], None]):
@@ -45,45 +141,65 @@ class TrayManager:
         self.quit_callback = quit_callback
         self.tray_icon = None
         self.tray_thread = None
+        # Остановка могла быть запрошена до создания иконки в потоке трея
+        self._stop_requested = False
     
     def setup(self) -> None:
         """Настройка трей-иконки."""
-        if not HAS_PYSTRAY:
+        if not self.available():
             return
         
         try:
-            icon_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "materials", "icon", "icon.ico")
-            if not os.path.exists(icon_path):
-                icon_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "materials", "icon", "1000x1000.png")
+            icon_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), "materials", "icon")
+            # Первый существующий файл из списка
+            icon_path = next(
+                (path for path in (os.path.join(icon_dir, name) for name in _TRAY_ICON_NAMES)
+                 if os.path.isfile(path)),
+                None
+            )
             
-            if os.path.exists(icon_path):
-                img = PILImage.open(icon_path)
-                img = img.resize((64, 64), PILImage.Resampling.LANCZOS)
-                
-                menu = pystray.Menu(
-                    item('Показать', self.show_window),
-                    item('Выход', self.quit_app)
+            if icon_path:
+                # Загрузка картинки и создание иконки выполняются в потоке
+                # трея, чтобы не задерживать создание главного окна
+                self.tray_thread = threading.Thread(
+                    target=self._run_tray, args=(icon_path,), daemon=True
                 )
-                
-                self.tray_icon = pystray.Icon("Ренейм+", img, "Ренейм+", menu)
-                
-                # Запускаем трей в отдельном потоке
-                self.tray_thread = threading.Thread(target=self._run_tray, daemon=True)
                 self.tray_thread.start()
         except Exception as e:
             logger = logging.getLogger(__name__)
             logger.error(f"Не удалось настроить трей-иконку: {e}", exc_info=True)
     
-    def _run_tray(self) -> None:
-        """Запуск трей-иконки."""
-        if self.tray_icon:
+    def _run_tray(self, icon_path: str) -> None:
+        """Создание и запуск трей-иконки (выполняется в потоке трея).
+        
+        Args:
+            icon_path: Путь к файлу иконки
+        """
+        try:
+            import pystray
+            from pystray import MenuItem as item
+            
+            img = _load_tray_icon(icon_path)
+            
+            menu = pystray.Menu(
+                item('Показать', self.show_window),
+                item('Выход', self.quit_app)
+            )
+            
+            self.tray_icon = pystray.Icon("Ренейм+", img, "Ренейм+", menu)
+        except Exception as e:
+            logger = logging.getLogger(__name__)
+            logger.error(f"Не удалось настроить трей-иконку: {e}", exc_info=True)
+            return
+        
+        if not self._stop_requested:
             self.tray_icon.run()
     
-    def show_window(self, icon: Optional[pystray.Icon] = None, item: Optional[pystray.MenuItem] = None) -> None:
+    def show_window(self, icon: Optional["pystray.Icon"] = None, item: Optional["pystray.MenuItem"] = None) -> None:
         """Показать главное окно."""
         self.show_callback()
     
-    def quit_app(self, icon: Optional[pystray.Icon] = None, item: Optional[pystray.MenuItem] = None) -> None:
+    def quit_app(self, icon: Optional["pystray.Icon"] = None, item: Optional["pystray.MenuItem"] = None) -> None:
         """Выход из приложения."""
         if self.tray_icon:
             self.tray_icon.stop()
@@ -91,6 +207,7 @@ class TrayManager:
     
     def stop(self) -> None:
         """Остановка трей-иконки."""
+        self._stop_requested = True
         if self.tray_icon:
             self.tray_icon.stop()
 
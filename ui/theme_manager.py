@@ -1,7 +1,8 @@
 """Модуль для управления темами интерфейса."""
 
 import tkinter as tk
-from typing import Dict
+from types import MappingProxyType
+from typing import Mapping
 
 
 class ThemeManager:
@@ -83,6 +84,10 @@ class ThemeManager:
         'gradient_end': '#764BA2'
     }
     
+    # Общие неизменяемые представления тем (без копирования при каждом вызове)
+    _LIGHT_VIEW = MappingProxyType(LIGHT_THEME)
+    _DARK_VIEW = MappingProxyType(DARK_THEME)
+    
     def __init__(self, theme: str = 'light'):
         """Инициализация менеджера тем.
         
@@ -92,18 +97,18 @@ class ThemeManager:
         self.current_theme = theme
         self.colors = self.get_theme_colors(theme)
     
-    def get_theme_colors(self, theme: str) -> Dict[str, str]:
+    def get_theme_colors(self, theme: str) -> Mapping[str, str]:
         """Получение цветов темы.
         
         Args:
             theme: Название темы
             
         Returns:
-            Словарь с цветами
+            Неизменяемое представление словаря с цветами
         """
         if theme == 'dark':
-            return self.DARK_THEME.copy()
-        return self.LIGHT_THEME.copy()
+            return self._DARK_VIEW
+        return self._LIGHT_VIEW
     
     def set_theme(self, theme: str) -> None:
         """Установка темы.